@@ -0,0 +1,5 @@
+"""Helpers shared by the games in this repo.
+
+Each game adds the repo root to sys.path before importing from here, so
+the games still run straight from their own folders.
+"""
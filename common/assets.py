@@ -0,0 +1,183 @@
+"""Background asset loading shared by the games.
+
+Sounds and images load on a small thread pool, so the window and the
+first frame never wait on the mixer or the disk. Lookups never block:
+
+    assets = AssetLoader(game_dir)
+    assets.load_sound("win.wav")        # start loading, returns a Future
+    sound = assets.sound("win.wav")     # the Sound, or None until it's ready
+
+Each asset falls back on its own. A missing or unreadable sound file is
+replaced by a short effect synthesized with NumPy from SYNTH_RECIPES
+(keyed by the file's stem), written to CACHE_DIR as a WAV so later runs
+just load it; without NumPy or without audio the sound is None and
+stays silent. A missing image becomes a magenta placeholder. Failures
+are kept in AssetLoader.failed for anyone who wants to know.
+"""
+import io
+import os
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from common.startup import init_mixer
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pypuzzle", "sounds")
+
+# Bump when the recipes change so stale cached effects are rebuilt
+SYNTH_VERSION = 1
+SAMPLE_RATE = 22050
+
+# Effect per sound name: (waveform, start Hz, end Hz, seconds, volume).
+# Frequencies sweep from start to end; "noise" ignores them.
+SYNTH_RECIPES = {
+    "move": ("square", 660, 660, 0.05, 0.25),
+    "swap": ("square", 330, 880, 0.12, 0.3),
+    "fire": ("noise", 0, 0, 0.25, 0.35),
+    "water": ("sine", 900, 300, 0.2, 0.4),
+    "hurt": ("square", 180, 90, 0.2, 0.35),
+    "ammo": ("sine", 1320, 1760, 0.1, 0.35),
+    "win": ("sine", 523, 1047, 0.6, 0.4),
+}
+DEFAULT_RECIPE = ("sine", 440, 440, 0.1, 0.3)
+
+PLACEHOLDER_SIZE = (32, 32)
+PLACEHOLDER_COLOR = (255, 0, 255)
+
+
+def synthesize(recipe, rate=SAMPLE_RATE):
+    """Mono 16-bit samples for recipe, with a short fade in and out"""
+    import numpy as np  # Optional: only needed when a sound file is missing
+
+    waveform, start, end, seconds, volume = recipe
+    count = int(rate * seconds)
+    if waveform == "noise":
+        samples = np.random.default_rng(0).uniform(-1.0, 1.0, count)
+    else:
+        freq = np.linspace(start, end, count)
+        phase = 2 * np.pi * np.cumsum(freq) / rate
+        samples = np.sin(phase)
+        if waveform == "square":
+            samples = np.sign(samples)
+
+    envelope = np.ones(count)
+    fade = min(count // 4, rate // 100)
+    if fade:
+        envelope[:fade] = np.linspace(0.0, 1.0, fade)
+        envelope[-fade:] = np.linspace(1.0, 0.0, fade)
+    decay = np.exp(-3.0 * np.arange(count) / count)
+    return (samples * envelope * decay * volume * 32767).astype("<i2")
+
+
+def to_wav(samples, rate=SAMPLE_RATE):
+    """Mono 16-bit samples as the bytes of a WAV file"""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
+    return out.getvalue()
+
+
+class AssetLoader:
+    """Loads sounds and images from asset_dir on background threads"""
+
+    def __init__(self, asset_dir, cache_dir=CACHE_DIR, workers=2):
+        self.asset_dir = asset_dir
+        self.cache_dir = cache_dir
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        self.lock = threading.Lock()
+        self.sounds = {}   # name -> Future of Sound or None
+        self.images = {}   # name -> Future of Surface
+        self.converted = {}
+        self.failed = {}   # name -> why it fell back
+
+    def load_sound(self, name):
+        with self.lock:
+            if name not in self.sounds:
+                self.sounds[name] = self.pool.submit(self._read_sound, name)
+            return self.sounds[name]
+
+    def load_image(self, name):
+        with self.lock:
+            if name not in self.images:
+                self.images[name] = self.pool.submit(self._read_image, name)
+            return self.images[name]
+
+    def sound(self, name):
+        """The Sound if it has finished loading, otherwise None"""
+        future = self.load_sound(name)
+        return future.result() if future.done() else None
+
+    def image(self, name):
+        """The image converted for the display once it's loaded, otherwise None
+
+        Call from the main thread; conversion needs the display.
+        """
+        surface = self.converted.get(name)
+        if surface is None:
+            future = self.load_image(name)
+            if not future.done():
+                return None
+            surface = future.result()
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.converted[name] = surface
+        return surface
+
+    def wait(self, timeout=None):
+        """Block until everything requested so far has loaded (for tools)"""
+        with self.lock:
+            futures = list(self.sounds.values()) + list(self.images.values())
+        for future in futures:
+            future.result(timeout)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _read_sound(self, name):
+        if not init_mixer():
+            self.failed[name] = "no audio"
+            return None
+        try:
+            return pygame.mixer.Sound(os.path.join(self.asset_dir, name))
+        except (pygame.error, OSError) as e:
+            self.failed[name] = str(e)
+        try:
+            return pygame.mixer.Sound(file=io.BytesIO(self._synthesized(name)))
+        except (pygame.error, OSError, ImportError) as e:
+            self.failed[name] = f"{self.failed[name]}; no fallback: {e}"
+            return None
+
+    def _synthesized(self, name):
+        """WAV bytes of the fallback effect for name, from the cache if there"""
+        stem = os.path.splitext(os.path.basename(name))[0]
+        path = os.path.join(self.cache_dir, f"{stem}-v{SYNTH_VERSION}.wav")
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+
+        data = to_wav(synthesize(SYNTH_RECIPES.get(stem, DEFAULT_RECIPE)))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError:
+            pass  # Read-only cache: synthesize again next run
+        return data
+
+    def _read_image(self, name):
+        try:
+            return pygame.image.load(os.path.join(self.asset_dir, name))
+        except (pygame.error, OSError) as e:
+            self.failed[name] = str(e)
+            surface = pygame.Surface(PLACEHOLDER_SIZE)
+            surface.fill(PLACEHOLDER_COLOR)
+            return surface
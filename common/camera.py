@@ -0,0 +1,59 @@
+"""Scrolling camera for boards bigger than the window."""
+import pygame
+
+
+class Camera:
+    """Maps board cells to screen pixels through a fixed-size viewport
+
+    The view shows at most view_cols x view_rows tiles, centred on
+    `center` (screen pixels), and scrolls in whole tiles. follow() keeps a
+    target cell at least `margin` tiles inside the view, so it only
+    scrolls when the target nears an edge instead of on every move. Boards
+    that fit the view never scroll.
+    """
+
+    def __init__(self, board_width, board_height, tile_size, view_cols, view_rows,
+                 center, margin=2):
+        self.board_width = board_width
+        self.board_height = board_height
+        self.tile_size = tile_size
+        self.cols = min(view_cols, board_width)
+        self.rows = min(view_rows, board_height)
+        self.margin = min(margin, (self.cols - 1) // 2, (self.rows - 1) // 2)
+        self.view = pygame.Rect(0, 0, self.cols * tile_size, self.rows * tile_size)
+        self.view.center = center
+        # Board cell shown in the view's top-left corner
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y):
+        """Scroll so (x, y) sits inside the margin; True if the view moved"""
+        new_x = _clamp_axis(self.x, x, self.cols, self.board_width, self.margin)
+        new_y = _clamp_axis(self.y, y, self.rows, self.board_height, self.margin)
+        moved = (new_x, new_y) != (self.x, self.y)
+        self.x, self.y = new_x, new_y
+        return moved
+
+    def visible_range(self):
+        """(x0, y0, x1, y1): the cells in view, x1/y1 exclusive"""
+        return self.x, self.y, self.x + self.cols, self.y + self.rows
+
+    def is_visible(self, x, y):
+        return self.x <= x < self.x + self.cols and self.y <= y < self.y + self.rows
+
+    def cell_origin(self, x, y):
+        """Screen pixel of a (possibly fractional) cell's top-left corner"""
+        return (self.view.left + (x - self.x) * self.tile_size,
+                self.view.top + (y - self.y) * self.tile_size)
+
+    def tile_rect(self, x, y):
+        left, top = self.cell_origin(x, y)
+        return pygame.Rect(round(left), round(top), self.tile_size, self.tile_size)
+
+
+def _clamp_axis(origin, target, span, size, margin):
+    if target < origin + margin:
+        origin = target - margin
+    elif target > origin + span - 1 - margin:
+        origin = target - span + 1 + margin
+    return max(0, min(origin, size - span))
@@ -0,0 +1,26 @@
+"""Dirty-rectangle bookkeeping for pygame front ends."""
+import pygame
+
+
+class DirtyRects:
+    """Collects the screen regions that changed since the last present()"""
+
+    def __init__(self):
+        self.rects = []
+        self.full = True  # First frame always goes out whole
+
+    def add(self, rect):
+        self.rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """Push the whole frame next time"""
+        self.full = True
+
+    def present(self):
+        """Send pending changes to the display; does nothing on idle frames"""
+        if self.full:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.full = False
+        self.rects.clear()
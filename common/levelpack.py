@@ -0,0 +1,149 @@
+"""Binary level packs, read lazily through mmap.
+
+A pack holds any number of levels in one file:
+
+    header   magic b"LVPK", version (u16), flags (u16), count (u32)
+    index    count x u64: file offset of each record
+    records  width (u16), height (u16), meta length (u32),
+             meta (UTF-8 JSON), width * height cell bytes, row-major
+
+Meta is everything in a level dict except the grid: name, start and goal
+positions, par, ammo, hazards and so on, whatever the game keeps there.
+JSON turns tuples into lists, which the games unpack the same way.
+
+Opening a pack maps the file and checks the header; nothing else is read
+until a level is asked for, and reading level N touches only its index
+slot and its own record, so it costs the same in a pack of ten levels or
+a hundred thousand.
+
+    write_pack("levels.pack", LEVELS)
+    levels = load_levels("levels.pack", LEVELS)  # Falls back if missing
+    data = levels[3]
+
+The games' level_generator.py scripts share their command line through
+generator_parser and build_pack.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+MAGIC = b"LVPK"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHI")
+OFFSET = struct.Struct("<Q")
+RECORD = struct.Struct("<HHI")
+
+
+class LevelPack:
+    """Read-only sequence of level dicts backed by a mapped pack file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path}: not a level pack")
+        magic, version, _flags, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a level pack")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported level pack version {version}")
+        if len(self.data) < HEADER.size + self.count * OFFSET.size:
+            raise ValueError(f"{path}: truncated level pack")
+        self.path = path
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, level_num):
+        if level_num < 0:
+            level_num += self.count
+        if not 0 <= level_num < self.count:
+            raise IndexError("level pack index out of range")
+
+        data = self.data
+        (offset,) = OFFSET.unpack_from(data, HEADER.size + level_num * OFFSET.size)
+        width, height, meta_length = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        level = json.loads(data[start:start + meta_length])
+        start += meta_length
+        level["grid"] = [list(data[row:row + width])
+                         for row in range(start, start + width * height, width)]
+        return level
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_pack(path, levels):
+    """Write level dicts (each with a "grid" of cell codes) to a pack file"""
+    records = []
+    for level in levels:
+        grid = level["grid"]
+        meta = json.dumps({key: value for key, value in level.items() if key != "grid"},
+                          separators=(",", ":")).encode()
+        cells = bytes(cell for row in grid for cell in row)
+        records.append(RECORD.pack(len(grid[0]), len(grid), len(meta)) + meta + cells)
+
+    offset = HEADER.size + len(records) * OFFSET.size
+    offsets = []
+    for record in records:
+        offsets.append(OFFSET.pack(offset))
+        offset += len(record)
+
+    # Write beside the target and swap in, so a running game never maps half a file
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records)))
+        f.write(b"".join(offsets))
+        f.write(b"".join(records))
+    os.replace(temp, path)
+    return len(records)
+
+
+def load_levels(path, fallback):
+    """The pack at path if there is one, otherwise the fallback level list"""
+    if os.path.exists(path):
+        return LevelPack(path)
+    return fallback
+
+
+def generator_parser(description, pack_path):
+    """Arguments every level generator takes; the caller adds its own"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=8, help="board width and height")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--out", default=pack_path)
+    return parser
+
+
+def build_pack(path, generate, verdict_names, label="levels"):
+    """Run generate(report), write its levels to path and print the rate
+
+    report gets the verdict tallies after every batch and prints them to
+    stderr.
+    """
+    started = time.perf_counter()
+
+    def report(tallies):
+        summary = ", ".join(f"{n} {name}" for n, name in zip(tallies, verdict_names))
+        print(f"{sum(tallies)} candidates: {summary}", file=sys.stderr)
+
+    levels = generate(report)
+    write_pack(path, levels)
+    elapsed = time.perf_counter() - started
+    print(f"{len(levels)} {label} -> {path} "
+          f"({elapsed:.1f} s, {len(levels) / elapsed * 3600:.0f} levels/hour)")
+    return 0
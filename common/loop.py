@@ -0,0 +1,66 @@
+"""Main-loop helpers shared by the games."""
+import pygame
+
+# Longest an idle loop sleeps before waking on its own
+IDLE_TIMEOUT_MS = 500
+
+# The window needs repainting from the last frame after these
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+
+
+def next_events(busy, clock, fps, idle_timeout=IDLE_TIMEOUT_MS, woke=None):
+    """Events for one loop iteration
+
+    While busy (an animation or cascade is running) this ticks at fps and
+    polls, like a classic game loop. Otherwise it sleeps in
+    pygame.event.wait until input arrives or idle_timeout ms pass, so an
+    idle puzzle costs next to no CPU. woke, if given, is called as soon as
+    the sleeping is over, before any polling.
+    """
+    if busy:
+        clock.tick(fps)
+        if woke is not None:
+            woke()
+        return pygame.event.get()
+
+    event = pygame.event.wait(idle_timeout)
+    if woke is not None:
+        woke()
+    if event.type == pygame.NOEVENT:
+        return []
+    events = [event]
+    events.extend(pygame.event.get())
+    return events
+
+
+class FixedTimestep:
+    """Runs a simulation in fixed steps, however long each frame takes
+
+    Real time goes into an accumulator and update() runs once per whole
+    step in it, so simulation speed doesn't depend on the frame rate. A
+    frame runs at most max_steps updates; a longer stall is dropped rather
+    than replayed, so one slow frame can't snowball into the next. The
+    fraction of a step left over is returned as alpha for interpolating
+    moving things between the last two simulation states.
+
+    speed scales real time, e.g. speed=1000 runs 1000x real time.
+    """
+
+    def __init__(self, step=1 / 60, max_steps=5, speed=1.0):
+        self.step = step
+        self.max_steps = max_steps
+        self.speed = speed
+        self.accumulator = 0.0
+
+    def advance(self, elapsed, update):
+        """Feed elapsed real seconds; returns alpha in [0, 1]"""
+        self.accumulator += elapsed * self.speed
+        steps = 0
+        while self.accumulator >= self.step and steps < self.max_steps:
+            update()
+            self.accumulator -= self.step
+            steps += 1
+
+        # Drop whatever a stall left beyond one more frame's catch-up
+        self.accumulator = min(self.accumulator, self.step * self.max_steps)
+        return min(self.accumulator / self.step, 1.0)
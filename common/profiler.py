@@ -0,0 +1,200 @@
+"""Per-frame phase timing shared by the games.
+
+The main loops wrap each part of a frame in a named phase:
+
+    profiler.begin_frame()
+    with profiler.phase("update"):
+        ...
+    profiler.end_frame()
+
+Phases can nest (draw contains board, entities and hud) and can run more
+than once a frame; a frame's time for a phase is the sum of its runs.
+Everything goes into fixed-size ring buffers, so recording never
+allocates and the last `frames` frames are always at hand:
+
+    stats()              {phase: (p50, p99)} in seconds, "frame" included
+    draw_overlay(...)    those numbers in a corner of the screen
+    export_trace(path)   every buffered span as Chrome trace-event JSON,
+                         for chrome://tracing or https://ui.perfetto.dev
+
+A disabled profiler hands out a shared do-nothing phase.
+"""
+import json
+import os
+import time
+from array import array
+from contextlib import nullcontext
+
+import pygame
+
+DEFAULT_FRAMES = 600     # Ten seconds at 60 FPS
+SPANS_PER_FRAME = 32     # Room in the span ring per buffered frame
+MAX_PHASES = 16
+OVERLAY_REFRESH = 0.25   # Seconds between overlay text updates
+
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+_NOTHING = nullcontext()
+
+
+class _Phase:
+    """Context manager timing one named phase into the profiler's rings"""
+
+    __slots__ = ("profiler", "index", "start")
+
+    def __init__(self, profiler, index):
+        self.profiler = profiler
+        self.index = index
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.index, self.start, time.perf_counter() - self.start)
+
+
+class FrameProfiler:
+    def __init__(self, frames=DEFAULT_FRAMES, enabled=True):
+        self.frames = frames
+        self.enabled = enabled
+        self.show = False  # Whether the game draws the overlay
+        self.origin = time.perf_counter()
+
+        self.names = []
+        self.phases = {}
+        self.count = 0          # Frames finished
+        self.in_frame = False
+        self.frame_starts = array("d", bytes(8 * frames))
+        self.frame_times = array("d", bytes(8 * frames))
+        self.totals = array("d", bytes(8 * frames * MAX_PHASES))
+
+        spans = frames * SPANS_PER_FRAME
+        self.span_count = 0
+        self.span_phases = array("B", bytes(spans))
+        self.span_starts = array("d", bytes(8 * spans))
+        self.span_times = array("d", bytes(8 * spans))
+
+        self.overlay = None
+        self.overlay_time = 0.0
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NOTHING
+        timer = self.phases.get(name)
+        if timer is None:
+            if len(self.names) == MAX_PHASES:
+                raise ValueError(f"more than {MAX_PHASES} profiler phases")
+            timer = self.phases[name] = _Phase(self, len(self.names))
+            self.names.append(name)
+        return timer
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        slot = self.count % self.frames
+        self.frame_starts[slot] = time.perf_counter()
+        base = slot * MAX_PHASES
+        for i in range(base, base + MAX_PHASES):
+            self.totals[i] = 0.0
+        self.in_frame = True
+
+    def mark(self, name):
+        """Record name as a phase from the start of this frame until now"""
+        if self.in_frame:
+            start = self.frame_starts[self.count % self.frames]
+            self.record(self.phase(name).index, start, time.perf_counter() - start)
+
+    def discard_frame(self):
+        """Forget the frame begun last, e.g. an idle wake-up with nothing to do"""
+        self.in_frame = False
+
+    def end_frame(self):
+        if not self.in_frame:
+            return
+        slot = self.count % self.frames
+        self.frame_times[slot] = time.perf_counter() - self.frame_starts[slot]
+        self.count += 1
+        self.in_frame = False
+
+    def record(self, index, start, duration):
+        if not self.in_frame:
+            return  # Loading screens and the like aren't frames
+        self.totals[(self.count % self.frames) * MAX_PHASES + index] += duration
+        span = self.span_count % len(self.span_times)
+        self.span_phases[span] = index
+        self.span_starts[span] = start
+        self.span_times[span] = duration
+        self.span_count += 1
+
+    def stats(self):
+        """{phase: (p50, p99)} in seconds over the buffered frames"""
+        frames = min(self.count, self.frames)
+        if not frames:
+            return {}
+        result = {"frame": percentiles(self.frame_times[:frames])}
+        for index, name in enumerate(self.names):
+            times = self.totals[index:frames * MAX_PHASES:MAX_PHASES]
+            result[name] = percentiles(times)
+        return result
+
+    def draw_overlay(self, surface, font, bottomleft):
+        """Blit the p50/p99 table at bottomleft; returns the rect it covers"""
+        now = time.perf_counter()
+        if self.overlay is None or now - self.overlay_time >= OVERLAY_REFRESH:
+            self.overlay = self.render_overlay(font)
+            self.overlay_time = now
+        return surface.blit(self.overlay, self.overlay.get_rect(bottomleft=bottomleft))
+
+    def render_overlay(self, font):
+        """The table as a surface: phase names, then p50 and p99 in ms"""
+        rows = [("ms", "p50", "p99")]
+        for name, (p50, p99) in self.stats().items():
+            rows.append((name, f"{p50 * 1000:.2f}", f"{p99 * 1000:.2f}"))
+        cells = [[font.render(text, True, OVERLAY_COLOR) for text in row] for row in rows]
+
+        # Names left-aligned, numbers right-aligned, whatever the font
+        gap = font.size("  ")[0]
+        widths = [max(row[i].get_width() for row in cells) for i in range(3)]
+        height = font.get_linesize()
+        overlay = pygame.Surface((sum(widths) + 2 * gap + 8, height * len(rows) + 8))
+        overlay.fill(OVERLAY_BACKGROUND)
+        for y, row in enumerate(cells):
+            top = 4 + y * height
+            overlay.blit(row[0], (4, top))
+            right = 4 + widths[0]
+            for i in (1, 2):
+                right += gap + widths[i]
+                overlay.blit(row[i], (right - row[i].get_width(), top))
+        return overlay
+
+    def export_trace(self, path):
+        """Write the buffered frames and spans as Chrome trace-event JSON"""
+        pid = os.getpid()
+
+        def event(name, start, duration):
+            return {"name": name, "ph": "X", "pid": pid, "tid": 0,
+                    "ts": (start - self.origin) * 1e6, "dur": duration * 1e6}
+
+        events = []
+        for i in range(max(0, self.count - self.frames), self.count):
+            slot = i % self.frames
+            events.append(event("frame", self.frame_starts[slot], self.frame_times[slot]))
+        capacity = len(self.span_times)
+        for i in range(max(0, self.span_count - capacity), self.span_count):
+            span = i % capacity
+            events.append(event(self.names[self.span_phases[span]],
+                                self.span_starts[span], self.span_times[span]))
+
+        temp = f"{path}.{pid}.tmp"
+        with open(temp, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        os.replace(temp, path)
+        return len(events)
+
+
+def percentiles(values):
+    """(p50, p99) of a sequence, nearest rank"""
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return ordered[round(last * 0.5)], ordered[round(last * 0.99)]
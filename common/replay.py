@@ -0,0 +1,124 @@
+"""Compact replay logs shared by the games.
+
+A replay is a fixed header followed by one byte per thing that happened:
+
+    header  magic b"RPLY", version (u8), level (u32), RNG seed (u64)
+    body    0x00-0x7F  an action, numbered as the game's rules engine does
+            0x80-0xFF  1-128 fixed ticks of game time (byte - 0x7F)
+
+The rules engines are deterministic given the level, the seed of their
+RNG and the order of actions and ticks, so replaying the body against a
+fresh state rebuilds the run exactly; games without game time or
+randomness just never write ticks and leave the seed at 0. Ticks only
+happen while something is animating, and 128 of them fit in a byte, so
+a minute of play costs a few dozen bytes on top of its actions.
+
+Each game's verify_replays.py hands its check_file to verify_main, which
+supplies the command line, the worker pool and the summary.
+"""
+import argparse
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+MAGIC = b"RPLY"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBIQ")
+
+# Body bytes from WAIT up are tick counts
+WAIT = 0x80
+MAX_WAIT = 0x100 - WAIT
+
+
+def new_seed():
+    """A fresh 64-bit seed for a run that is going to be recorded"""
+    return random.getrandbits(64)
+
+
+class Recorder:
+    """Builds the replay of one level as it is played"""
+
+    def __init__(self, level, seed=0):
+        self.level = level
+        self.seed = seed
+        self.body = bytearray()
+        self.ticks = 0  # Not yet written; runs of ticks share bytes
+
+    def action(self, action):
+        self._flush_ticks()
+        self.body.append(action)
+
+    def tick(self, count=1):
+        self.ticks += count
+
+    def _flush_ticks(self):
+        while self.ticks:
+            run = min(self.ticks, MAX_WAIT)
+            self.body.append(WAIT + run - 1)
+            self.ticks -= run
+
+    def to_bytes(self):
+        self._flush_ticks()
+        return HEADER.pack(MAGIC, VERSION, self.level, self.seed) + bytes(self.body)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+def decode(data):
+    """(level, seed, body) from a replay's bytes; body is a memoryview"""
+    if len(data) < HEADER.size:
+        raise ValueError("not a replay")
+    magic, version, level, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a replay")
+    if version != VERSION:
+        raise ValueError(f"unsupported replay version {version}")
+    return level, seed, memoryview(data)[HEADER.size:]
+
+
+def replay_files(paths):
+    """The .rpl files in each folder of paths, and the other paths as given"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".rpl"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def verify_main(description, check_file, verdict_names, invalid, details, argv=None):
+    """Command line of a game's replay checker; exit status 1 if any run is invalid
+
+    check_file(path) returns (path, verdict, *fields), and details formats
+    the fields for the per-replay line, e.g. "({} moves)".
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("paths", nargs="+", help="replay files or folders of them")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+
+    files = list(replay_files(args.paths))
+    started = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(check_file, files, chunksize=256))
+    else:
+        results = [check_file(path) for path in files]
+    elapsed = time.perf_counter() - started
+
+    tallies = [0] * len(verdict_names)
+    for path, verdict, *fields in results:
+        tallies[verdict] += 1
+        if not args.quiet:
+            print(f"{path}: {verdict_names[verdict]} {details.format(*fields)}")
+    summary = ", ".join(f"{n} {name}" for n, name in zip(tallies, verdict_names))
+    rate = len(files) / elapsed * 60 if elapsed else 0
+    print(f"{len(files)} replays: {summary} ({elapsed:.2f} s, {rate:.0f}/minute)")
+    return 1 if tallies[invalid] else 0
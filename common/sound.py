@@ -0,0 +1,90 @@
+"""Sound event batching shared by the games.
+
+One move can set off a whole cascade of reactions, and every reacting
+neighbour reports its own event; playing each one straight away stacks a
+dozen copies of the same effect in one frame and runs the mixer out of
+channels. SoundDispatcher collects the sounds asked for during a frame
+and plays them once, at the end of it:
+
+    sounds.post("fire.wav", priority=1)   # any number of times per frame
+    sounds.flush()                        # once per frame, in the main loop
+
+Each name plays at most once per flush, and not again within
+min_interval seconds of its last start, so a cascade that runs for many
+ticks doesn't restart it every frame. Sounds play on their own reserved
+channels, highest priority first. When every channel is busy, a new sound
+takes the channel of the lowest-priority sound that is playing, if that
+sound has a lower priority than the new one; otherwise the new sound is
+dropped and counted in dropped. A disabled dispatcher (headless runs)
+ignores everything and never touches the mixer.
+"""
+import time
+
+import pygame
+
+DEFAULT_CHANNELS = 6
+MIN_INTERVAL = 0.05
+
+
+class SoundDispatcher:
+    def __init__(self, assets, channels=DEFAULT_CHANNELS, min_interval=MIN_INTERVAL, enabled=True):
+        self.assets = assets
+        self.channel_count = channels
+        self.min_interval = min_interval
+        self.enabled = enabled
+        self.pending = {}      # name -> highest priority posted this frame
+        self.channels = None   # Reserved once the mixer is up
+        self.priorities = [0] * channels
+        self.last_started = {}
+        self.dropped = 0
+
+    def post(self, name, priority=0):
+        if not self.enabled:
+            return
+        if priority > self.pending.get(name, -1):
+            self.pending[name] = priority
+
+    def flush(self):
+        """Play this frame's sounds, highest priority first"""
+        if not self.pending:
+            return
+        queued = sorted(self.pending.items(), key=lambda item: -item[1])
+        self.pending.clear()
+        if self.channels is None and not self._reserve():
+            return  # No mixer yet: the sounds aren't loaded either
+
+        now = time.perf_counter()
+        for name, priority in queued:
+            sound = self.assets.sound(name)
+            if sound is None or now - self.last_started.get(name, -1.0) < self.min_interval:
+                continue
+            index = self._channel_for(priority)
+            if index is None:
+                self.dropped += 1
+                continue
+            self.channels[index].play(sound)
+            self.priorities[index] = priority
+            self.last_started[name] = now
+
+    def _reserve(self):
+        if not pygame.mixer.get_init():
+            return False
+        count = self.channel_count
+        if pygame.mixer.get_num_channels() < count:
+            pygame.mixer.set_num_channels(count)
+        pygame.mixer.set_reserved(count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(count)]
+        return True
+
+    def _channel_for(self, priority):
+        """A free channel, else the lowest-priority one below priority, else None"""
+        lowest = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            if lowest is None or self.priorities[index] < self.priorities[lowest]:
+                lowest = index
+        if self.priorities[lowest] < priority:
+            self.channels[lowest].stop()
+            return lowest
+        return None
@@ -0,0 +1,143 @@
+"""Lazy pygame start-up shared by the games.
+
+pygame.init() brings up every subsystem at once: the mixer can block for a
+while on machines without working audio, and SysFont scans the system font
+directories (fc-list on Linux) before it can open a single font. Nothing
+here runs at import, so tools and tests can import a game module for its
+constants and classes for free; each subsystem comes up the first time
+something needs it:
+
+    init_display(size, caption)   the window, from the game's main()
+    LazyFont(size)                a font that opens on its first render
+    init_mixer()                  audio, on the first sound; False if none
+
+Resolved font paths are kept in FONT_CACHE, so only the very first launch
+on a machine pays for the font scan. startup_timer times each phase; call
+startup_timer.report() after the first frame to see where launch time
+went.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pygame
+
+FONT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "pypuzzle", "fonts.json")
+
+
+class StartupTimer:
+    """Wall time of each named start-up phase, from when this module loaded"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - begin))
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def report(self, file=None):
+        file = sys.stderr if file is None else file
+        for name, seconds in self.phases:
+            print(f"  {name:<16} {seconds * 1000:7.1f} ms", file=file)
+        print(f"  {'total':<16} {self.elapsed() * 1000:7.1f} ms", file=file)
+
+
+# One timer for the whole process
+startup_timer = StartupTimer()
+
+
+def init_display(size, caption):
+    """Bring up video only and open the window"""
+    with startup_timer.phase("display"):
+        pygame.display.init()
+        screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(caption)
+    return screen
+
+
+_mixer_ready = None
+_mixer_lock = threading.Lock()
+
+
+def init_mixer():
+    """Start audio once; False (and no more attempts) if there is none
+
+    Safe to call from loader threads; the first caller does the work.
+    """
+    global _mixer_ready
+    with _mixer_lock:
+        if _mixer_ready is None:
+            with startup_timer.phase("mixer"):
+                try:
+                    pygame.mixer.init()
+                    _mixer_ready = True
+                except pygame.error:
+                    _mixer_ready = False
+    return _mixer_ready
+
+
+_font_paths = None
+
+
+def _load_font_paths():
+    try:
+        with open(FONT_CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def font_path(name):
+    """File for a system font name, None for pygame's default font"""
+    global _font_paths
+    if _font_paths is None:
+        _font_paths = _load_font_paths()
+    if name in _font_paths and (_font_paths[name] is None or os.path.exists(_font_paths[name])):
+        return _font_paths[name]
+
+    with startup_timer.phase("font scan"):
+        path = pygame.font.match_font(name)
+    _font_paths[name] = path
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+        temp = f"{FONT_CACHE}.{os.getpid()}.tmp"
+        with open(temp, "w") as f:
+            json.dump(_font_paths, f)
+        os.replace(temp, FONT_CACHE)
+    except OSError:
+        pass  # Read-only home: scan again next launch
+    return path
+
+
+class LazyFont:
+    """Stands in for pygame.font.SysFont(name, size) until first used"""
+
+    def __init__(self, size, name="Arial"):
+        self.point_size = size
+        self.font_name = name
+        self._font = None
+
+    def _open(self):
+        if self._font is None:
+            with startup_timer.phase(f"font {self.font_name} {self.point_size}"):
+                if not pygame.font.get_init():
+                    pygame.font.init()
+                self._font = pygame.font.Font(font_path(self.font_name), self.point_size)
+        return self._font
+
+    def render(self, text, antialias, color):
+        return self._open().render(text, antialias, color)
+
+    def __getattr__(self, attr):
+        return getattr(self._open(), attr)
@@ -0,0 +1,46 @@
+"""Rendered-text cache shared by the games.
+
+Font rasterization is one of the most expensive things a frame can do, and
+almost every string on screen (titles, instructions, HUD counters) is the
+same as last frame. TextCache keeps rendered surfaces keyed by
+(font, text, color, antialias) and evicts the least recently used ones
+once it holds `size` entries.
+"""
+from collections import OrderedDict
+
+DEFAULT_SIZE = 256
+
+
+class TextCache:
+    def __init__(self, size=DEFAULT_SIZE):
+        self.size = size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# One cache for the whole process
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """Cached stand-in for font.render(text, antialias, color)"""
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,568 @@
+"""Headless rules engine for Elemental Shift.
+
+Nothing in here touches pygame: no display, audio or fonts. The rules are
+plain functions over a State, and anything the front end should react to
+(sounds, win, game over) is reported back as a list of event codes.
+
+    state = new_state(0)
+    state, events = step(state, RIGHT)
+
+Reactions chain: a cell that turns into Fire or Water goes on the state's
+pending worklist and reacts with its own neighbours in turn, so a cascade
+costs one check per changed cell. step() runs the worklist to fixpoint by
+default; set State.reaction_budget to cap the checks per call and let
+propagate() finish the cascade over later frames.
+
+Anything that happens over time rather than on input runs in tick(), one
+fixed SIM_STEP at a time, so a headless caller can simulate() seconds of
+play as fast as the CPU allows.
+
+Set State.changes to a list to have every board write logged there as
+(x, y, old element); renderers use it to repaint only what changed.
+
+Set State.journal to a Journal for undo() and redo(). It keeps each
+action's board writes and counter differences rather than board copies,
+so taking an action back costs as much as the cells it touched; search
+code can step() forward and undo() back instead of cloning every node.
+"""
+import random
+from collections import deque
+
+GRID_SIZE = 8  # Built-in levels; any other size works too
+
+# Elements
+EMPTY, FIRE, WATER, EARTH, AIR, EXIT, WALL = 0, 1, 2, 3, 4, 5, 6
+AMMO = 7  # Ammo pickup (not implemented fully)
+
+# Game states
+MENU, PLAYING, LEVEL_COMPLETE, GAME_OVER = 0, 1, 2, 3
+
+# Actions
+LEFT, RIGHT, UP, DOWN, SWAP, ROTATE = 0, 1, 2, 3, 4, 5
+ACTIONS = (LEFT, RIGHT, UP, DOWN, SWAP, ROTATE)
+# Journal actions: not rules, so step() ignores them, but replays log them
+UNDO, REDO = 6, 7
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Events
+EV_MOVE, EV_HURT, EV_HEAL, EV_SWAP, EV_FIRE, EV_WATER, EV_AMMO, EV_WIN, EV_GAME_OVER = range(9)
+
+# Tiles the player can walk through
+PASSABLE_ELEMENTS = {EMPTY, FIRE, WATER, AIR, EXIT}
+# Tiles that can't be swapped or rotated
+FIXED_ELEMENTS = {EXIT, WALL}
+
+FIRE_DAMAGE = 10
+WATER_HEAL = 5
+AMMO_DROP_CHANCE = 0.1
+
+# Seconds of game time per tick()
+SIM_STEP = 1 / 60
+
+# Reaction checks the game allows per step()/tick(), so big cascades
+# spread over several ticks; replays must be checked with the same budget
+REACTIONS_PER_TICK = 32
+
+# Reaction rules: (element, neighbour) -> (element becomes, neighbour
+# becomes, events, chance). KEEP leaves a tile alone; chance None means the
+# rule always fires.
+KEEP = -1
+REACTION_RULES = {
+    # Fire + Water = both disappear (steam)
+    (FIRE, WATER): (EMPTY, EMPTY, (EV_WATER, EV_FIRE), None),
+    (WATER, FIRE): (EMPTY, EMPTY, (EV_WATER, EV_FIRE), None),
+    # Fire + Earth = Earth becomes Fire (spreads)
+    (FIRE, EARTH): (KEEP, FIRE, (EV_FIRE,), None),
+    # Water + Earth = Earth becomes Water (erosion)
+    (WATER, EARTH): (KEEP, WATER, (EV_WATER,), None),
+    # Create ammo pickup sometimes
+    (AIR, AIR): (KEEP, AMMO, (EV_AMMO,), AMMO_DROP_CHANCE),
+}
+
+
+def compile_rules(rules):
+    """Flatten rules into (table, reactive, element_count)
+
+    table[element * element_count + neighbour] is the rule tuple plus a
+    final flag saying whether the changed neighbour should react in turn,
+    or None. reactive[element] says whether element has any rules at all.
+    """
+    element_count = max(AMMO, *(e for pair in rules for e in pair)) + 1
+    reactive = [False] * element_count
+    for element, _ in rules:
+        reactive[element] = True
+
+    table = [None] * (element_count * element_count)
+    for (element, neighbor), (becomes, neighbor_becomes, events, chance) in rules.items():
+        spreads = neighbor_becomes != KEEP and reactive[neighbor_becomes]
+        table[element * element_count + neighbor] = (
+            becomes, neighbor_becomes, tuple(events), chance, spreads)
+    return table, tuple(reactive), element_count
+
+
+REACTION_TABLE, REACTIVE, ELEMENT_COUNT = compile_rules(REACTION_RULES)
+
+# Per-element lookups, sized like the rule table so new elements fit
+PASSABLE = tuple(element in PASSABLE_ELEMENTS for element in range(ELEMENT_COUNT))
+FIXED = tuple(element in FIXED_ELEMENTS for element in range(ELEMENT_COUNT))
+
+# Pars are certified optimal by elemental_solver.py (moving hazards aside)
+LEVELS = [
+    {
+        # Tutorial level - teaches mechanics
+        "name": "Tutorial: Learn the Elements",
+        "grid": [
+            [0, 6, 6, 6, 6, 6, 6, 6],
+            [0, 0, 0, 0, 0, 0, 0, 6],
+            [6, 0, 1, 3, 0, 0, 0, 6],
+            [6, 0, 3, 0, 0, 0, 5, 6],
+            [6, 0, 0, 0, 0, 3, 0, 6],
+            [6, 0, 2, 0, 3, 0, 0, 6],
+            [6, 0, 0, 0, 0, 0, 0, 6],
+            [6, 6, 6, 6, 6, 6, 6, 6]
+        ],
+        "start": (0, 0),
+        "par": 9,
+        "ammo": 5,
+    },
+    {
+        # First real puzzle
+        "name": "Level 1: Fire and Water",
+        "grid": [
+            [0, 6, 6, 6, 6, 6, 6, 6],
+            [0, 0, 1, 0, 0, 3, 0, 6],
+            [6, 0, 0, 2, 0, 0, 0, 6],
+            [6, 0, 0, 0, 4, 0, 0, 6],
+            [6, 0, 0, 0, 0, 0, 0, 6],
+            [6, 0, 0, 0, 0, 0, 0, 6],
+            [6, 0, 0, 0, 0, 0, 5, 6],
+            [6, 6, 6, 6, 6, 6, 6, 6]
+        ],
+        "start": (1, 1),
+        "par": 10,
+        "ammo": 7,
+    },
+    {
+        # More complex puzzle
+        "name": "Level 2: Chain Reactions",
+        "grid": [
+            [0, 0, 6, 6, 6, 6, 6, 6],
+            [6, 0, 1, 0, 0, 3, 0, 6],
+            [6, 0, 0, 2, 0, 0, 0, 6],
+            [6, 0, 0, 0, 4, 0, 0, 6],
+            [6, 0, 0, 0, 0, 3, 0, 6],
+            [6, 0, 0, 0, 0, 0, 2, 6],
+            [6, 0, 0, 0, 0, 0, 5, 6],
+            [6, 6, 6, 6, 6, 6, 6, 6]
+        ],
+        "start": (1, 1),
+        "par": 10,
+        "ammo": 9,
+        # Moving hazards: (kind, pattern, x, y), see hazards.py
+        "hazards": [("fire", "horizontal", 1, 4)],
+    },
+    {
+        # Advanced puzzle
+        "name": "Level 3: Master Shifter",
+        "grid": [
+            [6, 6, 6, 6, 6, 6, 6, 6],
+            [6, 0, 1, 0, 0, 3, 0, 6],
+            [6, 0, 0, 2, 0, 0, 0, 6],
+            [6, 0, 0, 0, 4, 0, 0, 6],
+            [6, 0, 0, 0, 0, 3, 0, 6],
+            [6, 0, 0, 0, 0, 0, 2, 6],
+            [6, 0, 0, 0, 0, 0, 5, 6],
+            [6, 6, 6, 6, 6, 6, 6, 6]
+        ],
+        "start": (1, 1),
+        "par": 10,
+        "ammo": 11,
+        "hazards": [("fire", "horizontal", 1, 4), ("water", "zigzag", 6, 2)],
+    },
+]
+
+
+class State:
+    """Everything the rules need to know about a level in progress"""
+    __slots__ = ("level", "width", "height", "x", "y", "health", "max_health", "ammo", "moves",
+                 "status", "rng", "pending", "reaction_budget", "changes", "ticks", "hazards",
+                 "journal")
+
+    def __init__(self, level, x, y, ammo, health=100, max_health=100, rng=None,
+                 reaction_budget=None):
+        self.level = level
+        self.width = len(level[0])
+        self.height = len(level)
+        self.x = x
+        self.y = y
+        self.health = health
+        self.max_health = max_health
+        self.ammo = ammo
+        self.moves = 0
+        self.status = PLAYING
+        # Own stream so simulations never share the global random state
+        self.rng = rng if rng is not None else random.Random()
+        # Cells still waiting to react with their neighbours
+        self.pending = deque()
+        # Max reaction checks per step()/propagate() call, None for no limit
+        self.reaction_budget = reaction_budget
+        # Board write log, (x, y, old element); None turns logging off
+        self.changes = None
+        # Fixed simulation steps run so far
+        self.ticks = 0
+        # Moving hazards (hazards.Hazards), None on boards without any
+        self.hazards = None
+        # Undo/redo history (Journal), None turns it off
+        self.journal = None
+
+    def clone(self):
+        other = State([row[:] for row in self.level], self.x, self.y, self.ammo,
+                      self.health, self.max_health, self.rng, self.reaction_budget)
+        other.moves = self.moves
+        other.status = self.status
+        other.ticks = self.ticks
+        if self.hazards is not None:
+            other.hazards = self.hazards.clone()
+        other.pending.extend(self.pending)
+        return other
+
+
+def new_state(level_num, rng=None):
+    return state_from_level(LEVELS[level_num], rng)
+
+
+def state_from_level(data, rng=None):
+    """Fresh State for a level dict, built-in or from a level pack"""
+    x, y = data["start"]
+    state = State([row[:] for row in data["grid"]], x, y, data["ammo"], rng=rng)
+    if data.get("hazards"):
+        # Imported here: hazards builds on this module's constants
+        from hazards import Hazards
+        state.hazards = Hazards.from_specs(state.width, state.height, data["hazards"])
+    return state
+
+
+def move_player(state, dx, dy, events):
+    new_x = state.x + dx
+    new_y = state.y + dy
+
+    if 0 <= new_x < state.width and 0 <= new_y < state.height:
+        target = state.level[new_y][new_x]
+
+        if PASSABLE[target]:
+            state.x = new_x
+            state.y = new_y
+            state.moves += 1
+            events.append(EV_MOVE)
+
+            # Take damage from fire
+            if target == FIRE:
+                state.health -= FIRE_DAMAGE
+                events.append(EV_HURT)
+                if state.health <= 0:
+                    state.status = GAME_OVER
+                    events.append(EV_GAME_OVER)
+
+            # Collect water (heals)
+            elif target == WATER:
+                state.health = min(state.health + WATER_HEAL, state.max_health)
+                events.append(EV_HEAL)
+                if state.changes is not None:
+                    state.changes.append((new_x, new_y, target))
+                if state.journal is not None:
+                    state.journal.cells.append((new_x, new_y, target))
+                state.level[new_y][new_x] = EMPTY
+
+            # Walking into a moving hazard hurts too
+            if state.hazards is not None and state.status == PLAYING:
+                hit = state.hazards.damage_at(new_x, new_y)
+                if hit:
+                    state.health -= hit
+                    events.append(EV_HURT)
+                    if state.health <= 0:
+                        state.status = GAME_OVER
+                        events.append(EV_GAME_OVER)
+
+            return True
+    return False
+
+
+def swap_tiles(state, x1, y1, x2, y2, events):
+    if state.ammo <= 0:
+        return False
+
+    width, height = state.width, state.height
+    if (0 <= x1 < width and 0 <= y1 < height and
+            0 <= x2 < width and 0 <= y2 < height):
+        level = state.level
+        # Can't swap exit or walls
+        if FIXED[level[y1][x1]] or FIXED[level[y2][x2]]:
+            return False
+
+        written = ((x1, y1, level[y1][x1]), (x2, y2, level[y2][x2]))
+        if state.changes is not None:
+            state.changes.extend(written)
+        if state.journal is not None:
+            state.journal.cells.extend(written)
+        level[y1][x1], level[y2][x2] = level[y2][x2], level[y1][x1]
+        state.moves += 1
+        state.ammo -= 1
+        events.append(EV_SWAP)
+
+        # Queue both tiles for elemental reactions
+        state.pending.append((x1, y1))
+        state.pending.append((x2, y2))
+        return True
+    return False
+
+
+def rotate_2x2(state, x, y, events):
+    if state.ammo <= 0:
+        return False
+
+    if 0 <= x < state.width - 1 and 0 <= y < state.height - 1:
+        row, below = state.level[y], state.level[y + 1]
+        a, b, c, d = row[x], row[x + 1], below[x], below[x + 1]
+
+        # Can't rotate if exit or walls are in the block
+        if FIXED[a] or FIXED[b] or FIXED[c] or FIXED[d]:
+            return False
+
+        # Rotate clockwise
+        written = ((x, y, a), (x + 1, y, b), (x, y + 1, c), (x + 1, y + 1, d))
+        if state.changes is not None:
+            state.changes.extend(written)
+        if state.journal is not None:
+            state.journal.cells.extend(written)
+        row[x], row[x + 1], below[x], below[x + 1] = c, a, d, b
+
+        state.moves += 1
+        state.ammo -= 1
+        events.append(EV_SWAP)
+
+        # Queue all rotated tiles for reactions
+        state.pending.extend(((x, y), (x + 1, y), (x, y + 1), (x + 1, y + 1)))
+        return True
+    return False
+
+
+def check_reactions(state, x, y, events):
+    """Handle elemental interactions between adjacent tiles
+
+    One lookup in REACTION_TABLE per neighbour. Neighbours that change into
+    an element with rules of its own are queued on state.pending so the
+    reaction keeps spreading from them.
+    """
+    width, height = state.width, state.height
+    if not (0 <= x < width and 0 <= y < height):
+        return
+
+    level = state.level
+    element = level[y][x]
+    if not REACTIVE[element]:
+        return
+    base = element * ELEMENT_COUNT
+
+    # Check all 4 directions
+    for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < width and 0 <= ny < height:
+            rule = REACTION_TABLE[base + level[ny][nx]]
+            if rule is None:
+                continue
+
+            becomes, neighbor_becomes, rule_events, chance, spreads = rule
+            if chance is not None and state.rng.random() >= chance:
+                continue
+            changes = state.changes
+            journal = state.journal
+            if becomes != KEEP:
+                if changes is not None:
+                    changes.append((x, y, level[y][x]))
+                if journal is not None:
+                    journal.cells.append((x, y, level[y][x]))
+                level[y][x] = becomes
+            if neighbor_becomes != KEEP:
+                if changes is not None:
+                    changes.append((nx, ny, level[ny][nx]))
+                if journal is not None:
+                    journal.cells.append((nx, ny, level[ny][nx]))
+                level[ny][nx] = neighbor_becomes
+                if spreads:
+                    state.pending.append((nx, ny))
+            events.extend(rule_events)
+
+
+def propagate(state, events, budget=None):
+    """Work through pending reactions until fixpoint or budget checks are done
+
+    Returns how many cells were checked; anything left stays on
+    state.pending for the next call.
+    """
+    pending = state.pending
+    checked = 0
+    while pending and (budget is None or checked < budget):
+        x, y = pending.popleft()
+        check_reactions(state, x, y, events)
+        checked += 1
+    return checked
+
+
+def check_win(state):
+    return state.level[state.y][state.x] == EXIT and state.health > 0
+
+
+def step(state, action):
+    """Apply one player action in place and return (state, events)"""
+    events = []
+    if state.status != PLAYING:
+        return state, events
+
+    journal = state.journal
+    if journal is not None:
+        before = journal.begin(state)
+
+    if action == SWAP:
+        # Swap with adjacent tile (right)
+        swap_tiles(state, state.x, state.y, state.x + 1, state.y, events)
+    elif action == ROTATE:
+        # Rotate 2x2 block at player's position
+        rotate_2x2(state, state.x, state.y, events)
+    else:
+        dx, dy = DIRECTIONS[action]
+        move_player(state, dx, dy, events)
+
+    if state.pending:
+        propagate(state, events, state.reaction_budget)
+
+    if state.status == PLAYING:
+        if check_win(state):
+            state.status = LEVEL_COMPLETE
+            events.append(EV_WIN)
+        elif state.health <= 0:
+            state.status = GAME_OVER
+            events.append(EV_GAME_OVER)
+
+    if journal is not None:
+        journal.commit(state, before)
+    return state, events
+
+
+class Journal:
+    """Undo and redo history for one State, as per-action deltas
+
+    A delta is the action's board writes as (x, y, element) plus how much
+    it changed the position, health, ammo and moves, and the status either
+    side of it. Writes made by a cascade that runs on in later ticks join
+    the delta of the action that started it. Undone deltas wait on a redo
+    stack until the next action clears it.
+    """
+    __slots__ = ("done", "undone", "cells")
+
+    def __init__(self):
+        self.done = []
+        self.undone = []
+        # Writes of the newest action; step() points this at a fresh list
+        self.cells = []
+
+    def begin(self, state):
+        """Open a delta for the action step() is about to run"""
+        previous = self.cells
+        self.cells = []
+        return (previous, state.x, state.y, state.health, state.ammo, state.moves,
+                state.status)
+
+    def commit(self, state, before):
+        previous, x, y, health, ammo, moves, status = before
+        if state.moves == moves:
+            # Action did nothing, so no delta; any leftover cascade it
+            # advanced still belongs to the previous one
+            previous.extend(self.cells)
+            self.cells = previous
+            return
+        self.done.append((self.cells, state.x - x, state.y - y, state.health - health,
+                          state.ammo - ammo, state.moves - moves, status, state.status))
+        self.undone.clear()
+
+    def __len__(self):
+        return len(self.done)
+
+
+def _exchange_cells(state, cells):
+    """Write each (x, y, element) back in reverse order; returns the inverse
+
+    The inverse holds what each write replaced, so exchanging it undoes
+    this exchange. Undo and redo are the same operation on opposite stacks.
+    """
+    level = state.level
+    changes = state.changes
+    inverse = []
+    for x, y, element in reversed(cells):
+        current = level[y][x]
+        if changes is not None:
+            changes.append((x, y, current))
+        inverse.append((x, y, current))
+        level[y][x] = element
+    return inverse
+
+
+def undo(state):
+    """Take back the newest action; False if there is none to take back
+
+    Refuses while a cascade is still pending, since the cascade's remaining
+    writes would land on the restored board.
+    """
+    journal = state.journal
+    if journal is None or not journal.done or state.pending:
+        return False
+    cells, dx, dy, dhealth, dammo, dmoves, status, _ = journal.done.pop()
+    inverse = _exchange_cells(state, cells)
+    state.x -= dx
+    state.y -= dy
+    state.health -= dhealth
+    state.ammo -= dammo
+    state.moves -= dmoves
+    journal.undone.append((inverse, dx, dy, dhealth, dammo, dmoves, status, state.status))
+    state.status = status
+    journal.cells = []
+    return True
+
+
+def redo(state):
+    """Put back the newest undone action; False if there is none"""
+    journal = state.journal
+    if journal is None or not journal.undone or state.pending:
+        return False
+    inverse, dx, dy, dhealth, dammo, dmoves, status, status_after = journal.undone.pop()
+    cells = _exchange_cells(state, inverse)
+    state.x += dx
+    state.y += dy
+    state.health += dhealth
+    state.ammo += dammo
+    state.moves += dmoves
+    state.status = status_after
+    journal.done.append((cells, dx, dy, dhealth, dammo, dmoves, status, status_after))
+    journal.cells = cells
+    return True
+
+
+def tick(state, events):
+    """Advance game time by one SIM_STEP
+
+    Finishes any reaction cascade step() left over, at most
+    state.reaction_budget checks per tick, and moves the hazards.
+    """
+    state.ticks += 1
+    if state.pending:
+        propagate(state, events, state.reaction_budget)
+    if state.hazards is not None and state.status == PLAYING:
+        state.hazards.update(state, events)
+
+
+def simulate(state, seconds, events=None):
+    """Run seconds of game time headless, with no real-time pacing"""
+    if events is None:
+        events = []
+    for _ in range(round(seconds / SIM_STEP)):
+        tick(state, events)
+    return events
@@ -1,19 +1,51 @@
 import pygame
 import sys
 import os
-from pygame import mixer
+import time
+import random
 
-# Initialize Pygame
-pygame.init()
-mixer.init()
+# Shared helpers live in the repo-level common package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.dirty import DirtyRects
+from common.text import render_text
+from common.loop import next_events, EXPOSE_EVENTS, FixedTimestep
+from common.camera import Camera
+from common.levelpack import load_levels
+from common.replay import Recorder, new_seed
+from common.startup import LazyFont, init_display, startup_timer
+from common.assets import AssetLoader
+from common.sound import SoundDispatcher
+from common.profiler import FrameProfiler
+
+# Elements, game states and the rules themselves live in the headless core
+from elemental_core import (
+    FIRE, WATER, EARTH, AIR, EXIT, WALL,
+    MENU, PLAYING, LEVEL_COMPLETE, GAME_OVER,
+    LEFT, RIGHT, UP, DOWN, SWAP, ROTATE,
+    EV_MOVE, EV_HURT, EV_HEAL, EV_SWAP, EV_FIRE, EV_WATER, EV_AMMO, EV_WIN,
+    UNDO, REDO, SIM_STEP, REACTIONS_PER_TICK, ELEMENT_COUNT, LEVELS, Journal,
+    state_from_level, step, tick, undo, redo,
+)
 
 # Constants
 WIDTH, HEIGHT = 800, 650  # Increased height for UI
-GRID_SIZE = 8
 TILE_SIZE = 70
-GRID_OFFSET_X = (WIDTH - GRID_SIZE * TILE_SIZE) // 2
-GRID_OFFSET_Y = (HEIGHT - GRID_SIZE * TILE_SIZE) // 2 - 30
+VIEW_TILES = 8  # Bigger boards scroll to follow the player
+BOARD_CENTER = (WIDTH // 2, HEIGHT // 2 - 30)
 FPS = 60
+EVENT_DRIVEN = True  # False ticks at FPS every frame, even when idle
+# Level pack shipped next to the game; the built-in LEVELS are the fallback
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+# Every finished level's replay is saved here (None to keep them in memory)
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+# Print how long each start-up phase took once the first frame is up
+STARTUP_REPORT = bool(os.environ.get("PYPUZZLE_STARTUP_REPORT"))
+# Headless runs can drop audio entirely: no mixer, no loading, no playing
+SOUND_ENABLED = not os.environ.get("PYPUZZLE_NO_SOUND")
+SOUND_CHANNELS = 6
+# Time every frame phase; F3 shows p50/p99 times, F4 saves a Chrome trace
+PROFILE = True
+TRACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frame_trace.json")
 
 # Colors
 WHITE = (255, 255, 255)
@@ -30,133 +62,199 @@ DARK_BLUE = (0, 0, 100)  # Background
 GRAY = (100, 100, 100)   # Walls
 YELLOW = (255, 255, 0)   # Ammo
 
-# Elements
-EMPTY, FIRE, WATER, EARTH, AIR, EXIT, WALL = 0, 1, 2, 3, 4, 5, 6
+# The window and the sprites converted to its pixel format; nothing is
+# initialised at import, setup_display() (called by main()) creates them
+screen = None
+clock = pygame.time.Clock()
+dirty = DirtyRects()
+# Sounds load in the background from next to the game; any that are
+# missing are replaced by synthesized effects
+assets = AssetLoader(os.path.dirname(os.path.abspath(__file__)))
+# Sounds asked for during a frame play once, together, at its end
+sounds = SoundDispatcher(assets, SOUND_CHANNELS, enabled=SOUND_ENABLED)
+profiler = FrameProfiler(enabled=PROFILE)
 
-# Game states
-MENU, PLAYING, LEVEL_COMPLETE, GAME_OVER = 0, 1, 2, 3
+# Fonts open on their first render
+font_large = LazyFont(72)
+font_medium = LazyFont(36)
+font_small = LazyFont(24)
+font_profiler = LazyFont(16)
 
-# Setup the screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("PyPuzzle: Elemental Shift - Enhanced")
-clock = pygame.time.Clock()
+# Region the HUD text and health bar are drawn into (overlaps the board)
+HUD_RECT = pygame.Rect(0, 0, WIDTH, 85)
+
+# Tile colours; anything missing (empty, ammo) shows the black background
+TILE_COLORS = {
+    FIRE: RED,
+    WATER: BLUE,
+    EARTH: BROWN,
+    AIR: CYAN,
+    EXIT: GOLD,
+    WALL: GRAY,
+}
+
+def build_tile_sprites():
+    """One pre-converted surface per element, grid line included"""
+    sprites = {}
+    for element in range(ELEMENT_COUNT):
+        sprite = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert()
+        sprite.fill(TILE_COLORS.get(element, BLACK))
+        pygame.draw.rect(sprite, BLACK, sprite.get_rect(), 1)  # Grid lines
+        sprites[element] = sprite
+    return sprites
+
+TILE_SPRITES = None
 
-# Create dummy sound objects if files don't exist
-class DummySound:
-    def play(self): pass
+HAZARD_COLORS = (DARK_RED, BLUE)  # Moving fire, moving water
 
-try:
-    swap_sound = mixer.Sound("swap.wav")
-    win_sound = mixer.Sound("win.wav")
-    move_sound = mixer.Sound("move.wav")
-    fire_sound = mixer.Sound("fire.wav")
-    water_sound = mixer.Sound("water.wav")
-    hurt_sound = mixer.Sound("hurt.wav")
-    ammo_sound = mixer.Sound("ammo.wav")
-except:
-    swap_sound = win_sound = move_sound = fire_sound = water_sound = hurt_sound = ammo_sound = DummySound()
+# Sound file and priority for each event the rules report; when every
+# channel is busy, a higher priority cuts a lower one off
+EVENT_SOUNDS = {
+    EV_MOVE: ("move.wav", 0),
+    EV_HURT: ("hurt.wav", 2),
+    EV_HEAL: ("water.wav", 1),
+    EV_SWAP: ("swap.wav", 1),
+    EV_FIRE: ("fire.wav", 1),
+    EV_WATER: ("water.wav", 1),
+    EV_AMMO: ("ammo.wav", 2),
+    EV_WIN: ("win.wav", 3),
+}
 
-# Fonts
-font_large = pygame.font.SysFont("Arial", 72)
-font_medium = pygame.font.SysFont("Arial", 36)
-font_small = pygame.font.SysFont("Arial", 24)
+def setup_display():
+    """Open the window and build everything that needs its pixel format"""
+    global screen, TILE_SPRITES
+    screen = init_display((WIDTH, HEIGHT), "PyPuzzle: Elemental Shift - Enhanced")
+    with startup_timer.phase("sprites"):
+        TILE_SPRITES = build_tile_sprites()
+    return screen
+
+def load_sounds():
+    """Start loading every event sound; any not loaded yet are skipped when posted"""
+    if not SOUND_ENABLED:
+        return
+    for name, _ in EVENT_SOUNDS.values():
+        assets.load_sound(name)
+
+KEY_ACTIONS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_SPACE: SWAP,  # Swap with adjacent tile (right)
+    pygame.K_r: ROTATE,    # Rotate 2x2 block at player's position
+}
+UNDO_KEY, REDO_KEY = pygame.K_z, pygame.K_y
+PROFILER_KEY, TRACE_KEY = pygame.K_F3, pygame.K_F4
 
 class Game:
     def __init__(self):
         self.state = MENU
         self.current_level = 0
-        self.max_level = 3
-        self.player_pos = [0, 0]
-        self.moves = 0
-        self.health = 100
+        self.levels = load_levels(PACK_PATH, LEVELS)
+        self.max_level = len(self.levels) - 1
         self.max_health = 100
-        self.ammo = 5
-        self.min_moves = 0
+        self.drawn_state = None  # Forces a full redraw on the next frame
+        self.alpha = 1.0
         self.load_level(self.current_level)
-        
+
+    # The rules state lives in self.sim; these keep draw() readable
+    @property
+    def level(self):
+        return self.sim.level
+
+    @property
+    def player_pos(self):
+        return (self.sim.x, self.sim.y)
+
+    @property
+    def moves(self):
+        return self.sim.moves
+
+    @property
+    def health(self):
+        return self.sim.health
+
+    @property
+    def ammo(self):
+        return self.sim.ammo
+
     def load_level(self, level_num):
-        self.moves = 0
-        self.ammo = 5 + level_num * 2  # More ammo in later levels
-        self.health = self.max_health
-        self.player_pos = [0, 0]
+        data = self.levels[level_num]
+        seed = new_seed()
+        self.sim = state_from_level(data, random.Random(seed))
+        self.sim.reaction_budget = REACTIONS_PER_TICK
+        self.sim.journal = Journal()
+        self.recorder = Recorder(level_num, seed)
+        self.level_name = data["name"]
+        self.min_moves = data.get("par")
+        self.drawn_state = None
         
-        if level_num == 0:
-            # Tutorial level - teaches mechanics
-            self.level = [
-                [0, 6, 6, 6, 6, 6, 6, 6],
-                [0, 0, 0, 0, 0, 0, 0, 6],
-                [6, 0, 1, 3, 0, 0, 0, 6],
-                [6, 0, 3, 0, 0, 0, 5, 6],
-                [6, 0, 0, 0, 0, 3, 0, 6],
-                [6, 0, 2, 0, 3, 0, 0, 6],
-                [6, 0, 0, 0, 0, 0, 0, 6],
-                [6, 6, 6, 6, 6, 6, 6, 6]
-            ]
-            self.level_name = "Tutorial: Learn the Elements"
-            self.min_moves = 8
-            
-        elif level_num == 1:
-            # First real puzzle
-            self.level = [
-                [0, 6, 6, 6, 6, 6, 6, 6],
-                [0, 0, 1, 0, 0, 3, 0, 6],
-                [6, 0, 0, 2, 0, 0, 0, 6],
-                [6, 0, 0, 0, 4, 0, 0, 6],
-                [6, 0, 0, 0, 0, 0, 0, 6],
-                [6, 0, 0, 0, 0, 0, 0, 6],
-                [6, 0, 0, 0, 0, 0, 5, 6],
-                [6, 6, 6, 6, 6, 6, 6, 6]
-            ]
-            self.level_name = "Level 1: Fire and Water"
-            self.min_moves = 12
-            self.player_pos = [1, 1]
-            
-        elif level_num == 2:
-            # More complex puzzle
-            self.level = [
-                [0, 0, 6, 6, 6, 6, 6, 6],
-                [6, 0, 1, 0, 0, 3, 0, 6],
-                [6, 0, 0, 2, 0, 0, 0, 6],
-                [6, 0, 0, 0, 4, 0, 0, 6],
-                [6, 0, 0, 0, 0, 3, 0, 6],
-                [6, 0, 0, 0, 0, 0, 2, 6],
-                [6, 0, 0, 0, 0, 0, 5, 6],
-                [6, 6, 6, 6, 6, 6, 6, 6]
-            ]
-            self.level_name = "Level 2: Chain Reactions"
-            self.min_moves = 15
-            self.player_pos = [1, 1]
-            
-        elif level_num == 3:
-            # Advanced puzzle
-            self.level = [
-                [6, 6, 6, 6, 6, 6, 6, 6],
-                [6, 0, 1, 0, 0, 3, 0, 6],
-                [6, 0, 0, 2, 0, 0, 0, 6],
-                [6, 0, 0, 0, 4, 0, 0, 6],
-                [6, 0, 0, 0, 0, 3, 0, 6],
-                [6, 0, 0, 0, 0, 0, 2, 6],
-                [6, 0, 0, 0, 0, 0, 5, 6],
-                [6, 6, 6, 6, 6, 6, 6, 6]
-            ]
-            self.level_name = "Level 3: Master Shifter"
-            self.min_moves = 20
-            self.player_pos = [1, 1]
+        self.sim.changes = []
+        self.camera = Camera(self.sim.width, self.sim.height, TILE_SIZE,
+                             VIEW_TILES, VIEW_TILES, BOARD_CENTER)
+        self.camera.follow(*self.player_pos)
+        self.build_board_layer()
+    
+    def build_board_layer(self):
+        """Render the visible board once; later frames only patch changed cells"""
+        self.board_rect = self.camera.view.inflate(4, 4)  # Grid background border
+        self.board_layer = pygame.Surface(self.board_rect.size).convert()
+        self.board_layer.fill(BLACK)
+        x0, y0, x1, y1 = self.camera.visible_range()
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                self.patch_tile(x, y)
     
-    def draw(self):
+    def scroll(self):
+        """Keep the player in view; True if the board layer was rebuilt"""
+        if not self.camera.follow(*self.player_pos):
+            return False
+        self.sim.changes.clear()
+        self.build_board_layer()
+        return True
+    
+    def patch_tile(self, x, y):
+        camera = self.camera
+        self.board_layer.blit(TILE_SPRITES[self.level[y][x]], 
+                              (2 + (x - camera.x) * TILE_SIZE, 2 + (y - camera.y) * TILE_SIZE))
+    
+    def draw(self, alpha=1.0):
+        # alpha is how far game time has got between the last two ticks;
+        # anything moving on its own draws interpolated by it
+        self.alpha = alpha
+        
+        # Menus and overlays are static: draw them once per state change
+        if self.state != self.drawn_state:
+            self.draw_full()
+            return
+        
+        if self.state == PLAYING or self.state == LEVEL_COMPLETE:
+            regions = self.changed_regions()
+            if not regions:
+                return  # Nothing changed, nothing to push
+            if self.state == LEVEL_COMPLETE:
+                self.draw_full()  # The overlay covers the whole frame anyway
+            else:
+                for rect in regions:
+                    self.draw_region(rect)
+    
+    def draw_full(self):
+        self.scroll()
+        self.sync_board_layer()
         screen.fill(DARK_BLUE)
         
         if self.state == MENU:
-            title = font_large.render("PyPuzzle: Elemental Shift", True, WHITE)
-            subtitle = font_medium.render("Enhanced Edition", True, YELLOW)
-            start_text = font_medium.render("Press SPACE to Start", True, WHITE)
+            title = render_text(font_large, "PyPuzzle: Elemental Shift", WHITE)
+            subtitle = render_text(font_medium, "Enhanced Edition", YELLOW)
+            start_text = render_text(font_medium, "Press SPACE to Start", WHITE)
             instructions = [
                 "Use ARROWS to move",
                 "SPACE to swap with adjacent tile",
                 "R to rotate 2x2 block",
                 "Avoid fire (lose health)",
                 "Collect blue ammo drops",
-                "Reach the golden exit"
+                "Reach the golden exit",
+                "Z / Y to undo / redo"
             ]
             
             screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//4))
@@ -164,216 +262,222 @@ class Game:
             screen.blit(start_text, (WIDTH//2 - start_text.get_width()//2, HEIGHT//2))
             
             for i, line in enumerate(instructions):
-                text = font_small.render(line, True, WHITE)
+                text = render_text(font_small, line, WHITE)
                 screen.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 + 60 + i*30))
                 
         elif self.state == GAME_OVER:
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))
-            screen.blit(overlay, (0, 0))
-            
-            game_over = font_large.render("Game Over!", True, RED)
-            restart = font_medium.render("Press R to restart", True, WHITE)
-            
-            screen.blit(game_over, (WIDTH//2 - game_over.get_width()//2, HEIGHT//2 - 50))
-            screen.blit(restart, (WIDTH//2 - restart.get_width()//2, HEIGHT//2 + 50))
+            with profiler.phase("overlay"):
+                overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+                overlay.fill((0, 0, 0, 200))
+                screen.blit(overlay, (0, 0))
+                
+                game_over = render_text(font_large, "Game Over!", RED)
+                restart = render_text(font_medium, "Press R to restart", WHITE)
+                
+                screen.blit(game_over, (WIDTH//2 - game_over.get_width()//2, HEIGHT//2 - 50))
+                screen.blit(restart, (WIDTH//2 - restart.get_width()//2, HEIGHT//2 + 50))
             
         elif self.state == PLAYING or self.state == LEVEL_COMPLETE:
-            # Draw grid background
-            pygame.draw.rect(screen, BLACK, (GRID_OFFSET_X-2, GRID_OFFSET_Y-2, 
-                                           GRID_SIZE*TILE_SIZE+4, GRID_SIZE*TILE_SIZE+4))
+            self.draw_layers()
             
-            # Draw tiles
-            for y in range(GRID_SIZE):
-                for x in range(GRID_SIZE):
-                    rect = pygame.Rect(GRID_OFFSET_X + x * TILE_SIZE, 
-                                     GRID_OFFSET_Y + y * TILE_SIZE, 
-                                     TILE_SIZE, TILE_SIZE)
-                    element = self.level[y][x]
+            if self.state == LEVEL_COMPLETE:
+                with profiler.phase("overlay"):
+                    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+                    overlay.fill((0, 0, 0, 180))
+                    screen.blit(overlay, (0, 0))
                     
-                    if element == FIRE:
-                        pygame.draw.rect(screen, RED, rect)
-                    elif element == WATER:
-                        pygame.draw.rect(screen, BLUE, rect)
-                    elif element == EARTH:
-                        pygame.draw.rect(screen, BROWN, rect)
-                    elif element == AIR:
-                        pygame.draw.rect(screen, CYAN, rect)
-                    elif element == EXIT:
-                        pygame.draw.rect(screen, GOLD, rect)
-                    elif element == WALL:
-                        pygame.draw.rect(screen, GRAY, rect)
+                    complete_text = render_text(font_large, "Level Complete!", WHITE)
+                    moves_made = render_text(font_medium, self.moves_line(), WHITE)
+                    next_text = render_text(font_medium, "Press SPACE to continue", WHITE)
                     
-                    pygame.draw.rect(screen, BLACK, rect, 1)  # Grid lines
-            
-            # Draw player
-            player_rect = pygame.Rect(
-                GRID_OFFSET_X + self.player_pos[0] * TILE_SIZE + TILE_SIZE//4,
-                GRID_OFFSET_Y + self.player_pos[1] * TILE_SIZE + TILE_SIZE//4,
-                TILE_SIZE//2, TILE_SIZE//2
-            )
-            pygame.draw.rect(screen, GREEN, player_rect)
-            
-            # Draw UI
-            level_text = font_small.render(f"{self.level_name}", True, WHITE)
-            moves_text = font_small.render(f"Moves: {self.moves} (Min: {self.min_moves})", True, WHITE)
-            ammo_text = font_small.render(f"Ammo: {self.ammo}", True, YELLOW)
-            
-            screen.blit(level_text, (20, 20))
-            screen.blit(moves_text, (20, 50))
-            screen.blit(ammo_text, (WIDTH - 120, 20))
-            
-            # Health bar
-            health_width = 200
-            current_health_width = (self.health / self.max_health) * health_width
-            pygame.draw.rect(screen, GRAY, (WIDTH//2 - health_width//2, 20, health_width, 20))
-            pygame.draw.rect(screen, DARK_GREEN, (WIDTH//2 - health_width//2, 20, current_health_width, 20))
-            health_text = font_small.render(f"Health: {self.health}/{self.max_health}", True, WHITE)
-            screen.blit(health_text, (WIDTH//2 - health_text.get_width()//2, 22))
-            
-            if self.state == LEVEL_COMPLETE:
-                overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 180))
-                screen.blit(overlay, (0, 0))
-                
-                complete_text = font_large.render("Level Complete!", True, WHITE)
-                moves_made = font_medium.render(f"Moves: {self.moves} (Min: {self.min_moves})", True, WHITE)
-                next_text = font_medium.render("Press SPACE to continue", True, WHITE)
-                
-                screen.blit(complete_text, (WIDTH//2 - complete_text.get_width()//2, HEIGHT//2 - 80))
-                screen.blit(moves_made, (WIDTH//2 - moves_made.get_width()//2, HEIGHT//2))
-                screen.blit(next_text, (WIDTH//2 - next_text.get_width()//2, HEIGHT//2 + 80))
+                    screen.blit(complete_text, (WIDTH//2 - complete_text.get_width()//2, HEIGHT//2 - 80))
+                    screen.blit(moves_made, (WIDTH//2 - moves_made.get_width()//2, HEIGHT//2))
+                    screen.blit(next_text, (WIDTH//2 - next_text.get_width()//2, HEIGHT//2 + 80))
+        
+        self.drawn_state = self.state
+        self.drawn_hazards = self.hazard_rects()
+        self.drawn_player = self.player_pos
+        self.drawn_hud = self.hud_values()
+        dirty.invalidate()
+    
+    def draw_region(self, rect):
+        """Redraw everything that overlaps rect and queue it for display"""
+        screen.set_clip(rect)
+        screen.fill(DARK_BLUE)
+        self.draw_layers(rect)
+        screen.set_clip(None)
+        dirty.add(rect)
+    
+    def draw_layers(self, area=None):
+        """Board, then hazards and player, then HUD, each timed by the profiler"""
+        with profiler.phase("board"):
+            self.draw_board(area)
+        with profiler.phase("entities"):
+            self.draw_hazards()
+            self.draw_player()
+        with profiler.phase("hud"):
+            self.draw_hud()
     
-    def move_player(self, dx, dy):
-        new_x = self.player_pos[0] + dx
-        new_y = self.player_pos[1] + dy
+    def changed_regions(self):
+        """Screen rects whose contents changed since they were last drawn"""
+        camera = self.camera
         
-        if 0 <= new_x < GRID_SIZE and 0 <= new_y < GRID_SIZE:
-            target = self.level[new_y][new_x]
-            
-            # Check if tile is passable
-            if target in [EMPTY, FIRE, WATER, AIR, EXIT]:  # Can walk through these
-                self.player_pos[0] = new_x
-                self.player_pos[1] = new_y
-                self.moves += 1
-                move_sound.play()
-                
-                # Take damage from fire
-                if target == FIRE:
-                    self.health -= 10
-                    hurt_sound.play()
-                    if self.health <= 0:
-                        self.state = GAME_OVER
-                
-                # Collect water (heals)
-                elif target == WATER:
-                    self.health = min(self.health + 5, self.max_health)
-                    water_sound.play()
-                    self.level[new_y][new_x] = EMPTY
-                
-                return True
-        return False
+        # Scrolling repaints the whole view; otherwise only changed cells
+        if self.scroll():
+            regions = [self.board_rect]
+        else:
+            regions = [camera.tile_rect(x, y) for x, y in self.sync_board_layer()]
+        
+        # Moving hazards: where they were drawn and where they are now
+        if self.sim.hazards is not None:
+            hazard_rects = self.hazard_rects()
+            if hazard_rects != self.drawn_hazards:
+                for rect, _ in self.drawn_hazards + hazard_rects:
+                    regions.append(rect.clip(camera.view))
+                self.drawn_hazards = hazard_rects
+        
+        if self.player_pos != self.drawn_player:
+            regions.append(camera.tile_rect(*self.drawn_player))
+            regions.append(camera.tile_rect(*self.player_pos))
+            self.drawn_player = self.player_pos
+        
+        hud = self.hud_values()
+        if hud != self.drawn_hud:
+            regions.append(HUD_RECT)
+            self.drawn_hud = hud
+        
+        return regions
     
-    def swap_tiles(self, x1, y1, x2, y2):
-        if self.ammo <= 0:
-            return False
-            
-        if (0 <= x1 < GRID_SIZE and 0 <= y1 < GRID_SIZE and 
-            0 <= x2 < GRID_SIZE and 0 <= y2 < GRID_SIZE):
-            # Can't swap exit or walls
-            if (self.level[y1][x1] in [EXIT, WALL] or 
-                self.level[y2][x2] in [EXIT, WALL]):
-                return False
-                
-            self.level[y1][x1], self.level[y2][x2] = self.level[y2][x2], self.level[y1][x1]
-            self.moves += 1
-            self.ammo -= 1
-            swap_sound.play()
-            
-            # Check for elemental reactions
-            self.check_reactions(x1, y1)
-            self.check_reactions(x2, y2)
-            return True
-        return False
+    def sync_board_layer(self):
+        """Patch visible cells the rules changed into the board layer; returns them"""
+        is_visible = self.camera.is_visible
+        cells = {(x, y) for x, y, _ in self.sim.changes if is_visible(x, y)}
+        self.sim.changes.clear()
+        for x, y in cells:
+            self.patch_tile(x, y)
+        return cells
     
-    def rotate_2x2(self, x, y):
-        if self.ammo <= 0:
-            return False
-            
-        if x < GRID_SIZE - 1 and y < GRID_SIZE - 1:
-            # Can't rotate if exit or walls are in the block
-            for dy in range(2):
-                for dx in range(2):
-                    if self.level[y+dy][x+dx] in [EXIT, WALL]:
-                        return False
-            
-            # Store the 2x2 block
-            a = self.level[y][x]
-            b = self.level[y][x + 1]
-            c = self.level[y + 1][x]
-            d = self.level[y + 1][x + 1]
-            
-            # Rotate clockwise
-            self.level[y][x] = c
-            self.level[y][x + 1] = a
-            self.level[y + 1][x] = d
-            self.level[y + 1][x + 1] = b
-            
-            self.moves += 1
-            self.ammo -= 1
-            swap_sound.play()
-            
-            # Check reactions on all rotated tiles
-            for dy in range(2):
-                for dx in range(2):
-                    self.check_reactions(x+dx, y+dy)
-            return True
-        return False
+    def draw_board(self, area=None):
+        if area is None:
+            screen.blit(self.board_layer, self.board_rect)
+        else:
+            # Just the part of the layer under area
+            visible = area.clip(self.board_rect)
+            if visible:
+                source = visible.move(-self.board_rect.left, -self.board_rect.top)
+                screen.blit(self.board_layer, visible.topleft, source)
+    
+    def hazard_rects(self):
+        """Tile-sized screen rects at each visible hazard's interpolated position"""
+        hazards = self.sim.hazards
+        if hazards is None:
+            return []
+        camera = self.camera
+        rects = []
+        for i in range(len(hazards)):
+            rect = camera.tile_rect(*hazards.draw_position(i, self.alpha))
+            if rect.colliderect(camera.view):
+                rects.append((rect, hazards.kind[i]))
+        return rects
     
-    def check_reactions(self, x, y):
-        """Handle elemental interactions between adjacent tiles"""
-        if not (0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE):
+    def draw_hazards(self):
+        if self.sim.hazards is None:
             return
-            
-        element = self.level[y][x]
+        # Hazards sliding past the edge of the view mustn't spill onto the HUD
+        clip = screen.get_clip()
+        screen.set_clip(clip.clip(self.camera.view))
+        for rect, kind in self.hazard_rects():
+            pygame.draw.circle(screen, HAZARD_COLORS[kind], rect.center, TILE_SIZE//3)
+            pygame.draw.circle(screen, WHITE, rect.center, TILE_SIZE//3, 2)
+        screen.set_clip(clip)
+    
+    def draw_player(self):
+        left, top = self.camera.cell_origin(*self.player_pos)
+        player_rect = pygame.Rect(
+            left + TILE_SIZE//4,
+            top + TILE_SIZE//4,
+            TILE_SIZE//2, TILE_SIZE//2
+        )
+        pygame.draw.rect(screen, GREEN, player_rect)
+    
+    def hud_values(self):
+        return (self.level_name, self.moves, self.min_moves, self.ammo, self.health)
+    
+    def moves_line(self):
+        # Pack levels don't have to carry a par
+        if self.min_moves is None:
+            return f"Moves: {self.moves}"
+        return f"Moves: {self.moves} (Min: {self.min_moves})"
+    
+    def draw_hud(self):
+        level_text = render_text(font_small, f"{self.level_name}", WHITE)
+        moves_text = render_text(font_small, self.moves_line(), WHITE)
+        ammo_text = render_text(font_small, f"Ammo: {self.ammo}", YELLOW)
         
-        # Check all 4 directions
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE:
-                neighbor = self.level[ny][nx]
-                
-                # Fire + Water = both disappear (steam)
-                if (element == FIRE and neighbor == WATER) or (element == WATER and neighbor == FIRE):
-                    self.level[y][x] = EMPTY
-                    self.level[ny][nx] = EMPTY
-                    water_sound.play()
-                    fire_sound.play()
-                
-                # Fire + Earth = Earth becomes Fire (spreads)
-                elif element == FIRE and neighbor == EARTH:
-                    self.level[ny][nx] = FIRE
-                    fire_sound.play()
-                
-                # Water + Earth = Earth becomes Water (erosion)
-                elif element == WATER and neighbor == EARTH:
-                    self.level[ny][nx] = WATER
-                    water_sound.play()
-                    
-                # Create ammo pickup sometimes
-                if element == AIR and neighbor == AIR and random.random() < 0.1:
-                    self.level[ny][nx] = 7  # Ammo pickup (not implemented fully)
+        screen.blit(level_text, (20, 20))
+        screen.blit(moves_text, (20, 50))
+        screen.blit(ammo_text, (WIDTH - 120, 20))
+        
+        # Health bar
+        health_width = 200
+        current_health_width = (self.health / self.max_health) * health_width
+        pygame.draw.rect(screen, GRAY, (WIDTH//2 - health_width//2, 20, health_width, 20))
+        pygame.draw.rect(screen, DARK_GREEN, (WIDTH//2 - health_width//2, 20, current_health_width, 20))
+        health_text = render_text(font_small, f"Health: {self.health}/{self.max_health}", WHITE)
+        screen.blit(health_text, (WIDTH//2 - health_text.get_width()//2, 22))
     
-    def check_win(self):
-        return self.level[self.player_pos[1]][self.player_pos[0]] == EXIT and self.health > 0
+    def act(self, action):
+        """Run one action through the rules and play whatever it triggered"""
+        self.recorder.action(action)
+        _, events = step(self.sim, action)
+        self.play_events(events)
+        self.sync_state()
+        return events
+    
+    def undo_move(self):
+        """Take back the last action (not while a cascade is still running)"""
+        if undo(self.sim):
+            self.recorder.action(UNDO)
+    
+    def redo_move(self):
+        if redo(self.sim):
+            self.recorder.action(REDO)
+    
+    def play_events(self, events):
+        if not SOUND_ENABLED:
+            return
+        for event in events:
+            sound = EVENT_SOUNDS.get(event)
+            if sound is not None:
+                sounds.post(*sound)
+    
+    def busy(self):
+        """True while something changes without input (cascade, hazards)"""
+        if self.state != PLAYING:
+            return False
+        return bool(self.sim.pending) or self.sim.hazards is not None
     
     def update(self):
-        if self.state == PLAYING:
-            if self.check_win():
-                win_sound.play()
-                self.state = LEVEL_COMPLETE
-            elif self.health <= 0:
-                self.state = GAME_OVER
+        """One fixed SIM_STEP of game time"""
+        if self.state != PLAYING:
+            return  # Game time stands still in menus and overlays
+        self.recorder.tick()
+        events = []
+        tick(self.sim, events)
+        self.play_events(events)
+        self.sync_state()
+    
+    def sync_state(self):
+        if self.state == PLAYING and self.sim.status != PLAYING:
+            self.state = self.sim.status
+            self.save_replay()
+    
+    def save_replay(self):
+        if REPLAY_DIR is None:
+            return
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        name = f"level{self.recorder.level}-{self.recorder.seed:016x}.rpl"
+        self.recorder.save(os.path.join(REPLAY_DIR, name))
     
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -387,23 +491,12 @@ class Game:
                     self.state = PLAYING
                     
             elif self.state == PLAYING:
-                if event.key == pygame.K_LEFT:
-                    self.move_player(-1, 0)
-                elif event.key == pygame.K_RIGHT:
-                    self.move_player(1, 0)
-                elif event.key == pygame.K_UP:
-                    self.move_player(0, -1)
-                elif event.key == pygame.K_DOWN:
-                    self.move_player(0, 1)
-                elif event.key == pygame.K_SPACE and self.ammo > 0:
-                    # Swap with adjacent tile (right)
-                    self.swap_tiles(
-                        self.player_pos[0], self.player_pos[1],
-                        self.player_pos[0] + 1, self.player_pos[1]
-                    )
-                elif event.key == pygame.K_r and self.ammo > 0:
-                    # Rotate 2x2 block at player's position
-                    self.rotate_2x2(self.player_pos[0], self.player_pos[1])
+                if event.key in KEY_ACTIONS:
+                    self.act(KEY_ACTIONS[event.key])
+                elif event.key == UNDO_KEY:
+                    self.undo_move()
+                elif event.key == REDO_KEY:
+                    self.redo_move()
             
             elif self.state == LEVEL_COMPLETE:
                 if event.key == pygame.K_SPACE:
@@ -417,24 +510,63 @@ class Game:
 
 # Main game loop
 def main():
-    game = Game()
+    setup_display()
+    load_sounds()  # In the background, while the first frame goes up
+    with startup_timer.phase("game"):
+        game = Game()
+    # Put the first frame up before waiting on anything
+    with startup_timer.phase("first frame"):
+        game.draw()
+        dirty.present()
+    if STARTUP_REPORT:
+        startup_timer.report()
+    timestep = FixedTimestep(SIM_STEP)
+    last = time.perf_counter()
     running = True
     
     while running:
-        for event in pygame.event.get():
+        # Sleep until input arrives unless something is animating
+        busy = not EVENT_DRIVEN or game.busy()
+        # A frame starts when the loop wakes up, not when it went to sleep
+        events = next_events(busy, clock, FPS, woke=profiler.begin_frame)
+        if events or busy:
+            profiler.mark("events")
+        else:
+            profiler.discard_frame()  # Idle wake-up with nothing to do
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
-            game.handle_input(event)
+            elif event.type in EXPOSE_EVENTS:
+                dirty.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+                profiler.show = not profiler.show
+                game.drawn_state = None  # Repaint what the overlay covered
+            elif event.type == pygame.KEYDOWN and event.key == TRACE_KEY:
+                profiler.export_trace(TRACE_PATH)
+            with profiler.phase("input"):
+                game.handle_input(event)
         
-        game.update()
-        game.draw()
+        # Game time runs in fixed steps, however long this frame took; time
+        # spent asleep waiting for input doesn't count
+        now = time.perf_counter()
+        elapsed = now - last if busy else 0.0
+        last = now
+        with profiler.phase("update"):
+            alpha = timestep.advance(elapsed, game.update)
+        with profiler.phase("sound"):
+            sounds.flush()
         
-        pygame.display.flip()
-        clock.tick(FPS)
+        with profiler.phase("draw"):
+            game.draw(alpha)
+        if profiler.show:
+            dirty.add(profiler.draw_overlay(screen, font_profiler, (10, HEIGHT - 10)))
+        with profiler.phase("flip"):
+            dirty.present()
+        profiler.end_frame()
     
+    assets.shutdown()
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    import random  # For random ammo drops
     main()
\ No newline at end of file
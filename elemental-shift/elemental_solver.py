@@ -0,0 +1,244 @@
+"""Optimal solver for Elemental Shift levels.
+
+IDA* over the real game actions (the four moves, SWAP and ROTATE) driven by
+elemental_core.step, so ammo, health, fire damage, water healing and every
+check_reactions side effect are exactly what the player gets. Memory stays
+bounded: the search itself is depth-first, and the transposition table of
+Zobrist-hashed states holds at most `table_size` entries, evicting the
+oldest when full. Nodes aren't copied either: the search step()s one state
+forward and undo()es its way back through a Journal, and the cells each
+step wrote (which the Journal records anyway) are XORed into the board
+hash, so no node rehashes the whole board. The heuristic is the Manhattan
+distance to the nearest exit, which is admissible because no action moves
+the player more than one tile and exits can't be swapped, rotated or
+created.
+
+The AIR+AIR ammo drop is random; the solver assumes it never happens, which
+is what the built-in levels (one AIR tile each) guarantee anyway. Moving
+hazards run on game time rather than per action, so they are left out.
+
+Run directly to certify the par of every built-in level, or of every
+level in a level pack:
+
+    python elemental_solver.py [levels.pack]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import LevelPack
+
+from elemental_core import (
+    ACTIONS, ELEMENT_COUNT, EXIT, LEVEL_COMPLETE, LEVELS, PLAYING, Journal, state_from_level,
+    step, undo,
+)
+
+DEFAULT_TABLE_SIZE = 1 << 20
+DEFAULT_MAX_DEPTH = 40
+DEFAULT_MAX_NODES = None  # No limit
+
+ACTION_NAMES = ("LEFT", "RIGHT", "UP", "DOWN", "SWAP", "ROTATE")
+
+FOUND = -1
+INFINITE = float("inf")
+
+
+class NoDropRandom:
+    """Stands in for a State's rng so reactions are deterministic"""
+
+    def random(self):
+        return 1.0
+
+
+class Zobrist:
+    """Random 64-bit keys for every (cell, element), position and counter"""
+
+    def __init__(self, width, height, elements=ELEMENT_COUNT, max_health=100, max_ammo=64,
+                 seed=0):
+        rng = random.Random(seed)
+        key = lambda: rng.getrandbits(64)
+        self.width = width
+        self.cells = [[key() for _ in range(elements)] for _ in range(width * height)]
+        self.position = [key() for _ in range(width * height)]
+        self.health = [key() for _ in range(max_health + 1)]
+        self.ammo = [key() for _ in range(max_ammo + 1)]
+
+    def board(self, state):
+        """Hash of the whole board; computed once, for the root"""
+        h = 0
+        cells = self.cells
+        i = 0
+        for row in state.level:
+            for element in row:
+                h ^= cells[i][element]
+                i += 1
+        return h
+
+    def delta(self, level, writes):
+        """What to XOR into a board hash for writes as a Journal records them
+
+        Each (x, y, element) write replaced element; walking them newest
+        first, the value after each write is the current cell or the value
+        the next write on that cell replaced.
+        """
+        h = 0
+        cells, width = self.cells, self.width
+        after = {}
+        for x, y, element in reversed(writes):
+            i = y * width + x
+            new = after.get(i)
+            if new is None:
+                new = level[y][x]
+            h ^= cells[i][element] ^ cells[i][new]
+            after[i] = element
+        return h
+
+    def key(self, state, board_hash):
+        """Full state hash from the board hash and the player's counters"""
+        return (board_hash ^ self.position[state.y * self.width + state.x] ^
+                self.health[max(state.health, 0)] ^ self.ammo[state.ammo])
+
+
+class TranspositionTable:
+    """Bounded map of state hash -> (g, iteration), oldest entries evicted first"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = {}
+        self.evictions = 0
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, value):
+        entries = self.entries
+        if key in entries:
+            # Re-insert so the entry counts as fresh
+            del entries[key]
+        elif len(entries) >= self.size:
+            del entries[next(iter(entries))]
+            self.evictions += 1
+        entries[key] = value
+
+
+def exit_cells(state):
+    return [(x, y) for y, row in enumerate(state.level)
+            for x, element in enumerate(row) if element == EXIT]
+
+
+class Solver:
+    def __init__(self, state, table_size=DEFAULT_TABLE_SIZE, max_depth=DEFAULT_MAX_DEPTH,
+                 max_nodes=DEFAULT_MAX_NODES):
+        self.root = state.clone()
+        self.root.rng = NoDropRandom()
+        self.root.hazards = None
+        self.root.journal = Journal()
+        self.exits = exit_cells(self.root)
+        self.zobrist = Zobrist(len(self.root.level[0]), len(self.root.level),
+                               max_health=self.root.max_health,
+                               max_ammo=max(self.root.ammo, 0))
+        self.table = TranspositionTable(table_size)
+        self.max_depth = max_depth
+        # Searches that hit max_nodes give up and report no solution
+        self.max_nodes = max_nodes
+        self.gave_up = False
+        self.nodes = 0
+
+    def heuristic(self, state):
+        x, y = state.x, state.y
+        return min((abs(x - ex) + abs(y - ey) for ex, ey in self.exits), default=INFINITE)
+
+    def solve(self):
+        """Shortest action list that completes the level, or None"""
+        bound = self.heuristic(self.root)
+        path = []
+        iteration = 0
+        while bound <= self.max_depth:
+            iteration += 1
+            result = self._search(self.root, self.zobrist.board(self.root), 0, bound,
+                                  path, iteration)
+            if result == FOUND:
+                return path
+            if result == INFINITE:
+                return None
+            bound = result
+        return None
+
+    def _search(self, state, board_hash, g, bound, path, iteration):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.gave_up = True
+            return INFINITE
+        f = g + self.heuristic(state)
+        if f > bound:
+            return f
+
+        key = self.zobrist.key(state, board_hash)
+        seen = self.table.get(key)
+        if seen is not None:
+            seen_g, seen_iteration = seen
+            # Reached more cheaply before, or already expanded at this cost
+            if seen_g < g or (seen_g == g and seen_iteration == iteration):
+                return INFINITE
+        self.table.put(key, (g, iteration))
+
+        best = INFINITE
+        for action in ACTIONS:
+            moves = state.moves
+            step(state, action)
+            if state.moves == moves:
+                continue  # Action did nothing
+            status = state.status
+            if status != PLAYING:
+                undo(state)
+                if status == LEVEL_COMPLETE:
+                    path.append(action)
+                    return FOUND
+                continue  # Game over
+            # The journal's newest delta is exactly what this action wrote;
+            # undo() puts the board back, and board_hash with it
+            child_hash = board_hash ^ self.zobrist.delta(state.level, state.journal.done[-1][0])
+            path.append(action)
+            result = self._search(state, child_hash, g + 1, bound, path, iteration)
+            undo(state)
+            if result == FOUND:
+                return FOUND
+            path.pop()
+            if result < best:
+                best = result
+        return best
+
+
+def solve(state, table_size=DEFAULT_TABLE_SIZE, max_depth=DEFAULT_MAX_DEPTH,
+          max_nodes=DEFAULT_MAX_NODES):
+    return Solver(state, table_size, max_depth, max_nodes).solve()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    levels = LevelPack(argv[0]) if argv else LEVELS
+    wrong = 0
+    for level_num, data in enumerate(levels):
+        solver = Solver(state_from_level(data))
+        started = time.perf_counter()
+        actions = solver.solve()
+        elapsed = time.perf_counter() - started
+        if actions is None:
+            verdict = f"UNSOLVABLE within {solver.max_depth}"
+            wrong += 1
+        else:
+            verdict = f"optimal {len(actions)}"
+            if len(actions) != data["par"]:
+                verdict += f" -- WRONG PAR {data['par']}"
+                wrong += 1
+        print(f"{level_num}: {data['name']}: {verdict} "
+              f"({solver.nodes} nodes, {elapsed:.2f} s)")
+        if actions:
+            print("   " + " ".join(ACTION_NAMES[action] for action in actions))
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
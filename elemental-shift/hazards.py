@@ -0,0 +1,169 @@
+"""Moving hazards for Elemental Shift.
+
+Hazards are fire that patrols horizontally and water that zigzags, and
+touching either drains health. They live in parallel arrays, one slot per
+hazard, rather than one object each, and a per-cell damage index makes
+"does anything hurt the player here?" a single array read however many
+hazards the board holds.
+
+Movement patterns are plain functions registered in PATTERNS:
+
+    def pattern(hazards, i, level) -> (x, y)
+
+returns hazard i's next cell and may update its dir/phase slots. Register
+new ones with register_pattern().
+
+No pygame here; elemental_core drives Hazards.update() from tick().
+"""
+from array import array
+
+from elemental_core import PASSABLE, EV_HURT, EV_GAME_OVER, GAME_OVER, PLAYING
+
+# Kinds
+FIRE_HAZARD, WATER_HAZARD = 0, 1
+KIND_NAMES = {"fire": FIRE_HAZARD, "water": WATER_HAZARD}
+HAZARD_DAMAGE = (10, 5)
+
+# Ticks between steps (SIM_STEP ticks, so 30 is twice a second)
+DEFAULT_INTERVAL = 30
+
+PATTERNS = {}
+PATTERN_IDS = {}
+
+
+def register_pattern(name, func):
+    PATTERN_IDS[name] = len(PATTERNS)
+    PATTERNS[PATTERN_IDS[name]] = func
+    return func
+
+
+def _open(level, x, y):
+    return 0 <= y < len(level) and 0 <= x < len(level[0]) and PASSABLE[level[y][x]]
+
+
+def horizontal(hazards, i, level):
+    """Walk left/right, turning round at anything the player couldn't enter"""
+    x, y = hazards.x[i], hazards.y[i]
+    for _ in range(2):
+        nx = x + hazards.dir[i]
+        if _open(level, nx, y):
+            return nx, y
+        hazards.dir[i] = -hazards.dir[i]
+    return x, y
+
+
+def zigzag(hazards, i, level):
+    """Alternate a sideways step with a step that flips up/down each time"""
+    x, y = hazards.x[i], hazards.y[i]
+    hazards.phase[i] += 1
+    if hazards.phase[i] % 2:
+        return horizontal(hazards, i, level)
+
+    dy = 1 if hazards.phase[i] % 4 == 2 else -1
+    if _open(level, x, y + dy):
+        return x, y + dy
+    if _open(level, x, y - dy):
+        return x, y - dy
+    return x, y
+
+
+register_pattern("horizontal", horizontal)
+register_pattern("zigzag", zigzag)
+
+
+class Hazards:
+    """All hazards on one board, array-backed, with a per-cell damage index"""
+    __slots__ = ("width", "height", "x", "y", "prev_x", "prev_y", "kind",
+                 "pattern", "dir", "phase", "interval", "countdown", "damage")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.x = array("h")
+        self.y = array("h")
+        # Where each hazard was before its last step, for smooth drawing
+        self.prev_x = array("h")
+        self.prev_y = array("h")
+        self.kind = bytearray()
+        self.pattern = bytearray()
+        self.dir = array("b")
+        self.phase = array("i")
+        self.interval = array("H")
+        self.countdown = array("H")
+        # Total damage of the hazards on each cell
+        self.damage = array("H", bytes(2 * width * height))
+
+    def __len__(self):
+        return len(self.x)
+
+    def add(self, kind, pattern, x, y, interval=DEFAULT_INTERVAL, direction=1):
+        self.x.append(x)
+        self.y.append(y)
+        self.prev_x.append(x)
+        self.prev_y.append(y)
+        self.kind.append(kind)
+        self.pattern.append(PATTERN_IDS[pattern])
+        self.dir.append(direction)
+        self.phase.append(0)
+        self.interval.append(interval)
+        self.countdown.append(interval)
+        self.damage[y * self.width + x] += HAZARD_DAMAGE[kind]
+
+    @classmethod
+    def from_specs(cls, width, height, specs):
+        """Build from level data: (kind name, pattern name, x, y) tuples"""
+        hazards = cls(width, height)
+        for kind, pattern, x, y in specs:
+            hazards.add(KIND_NAMES[kind], pattern, x, y)
+        return hazards
+
+    def clone(self):
+        other = Hazards.__new__(Hazards)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(other, name, value[:] if not isinstance(value, int) else value)
+        return other
+
+    def damage_at(self, x, y):
+        return self.damage[y * self.width + x]
+
+    def draw_position(self, i, alpha=0.0):
+        """Fractional cell position, sliding from the last cell to the new one
+
+        The slide takes the whole interval between steps; alpha is the
+        fraction of the current tick that has elapsed.
+        """
+        interval = self.interval[i]
+        t = min((interval - self.countdown[i] + alpha) / interval, 1.0)
+        px, py = self.prev_x[i], self.prev_y[i]
+        return px + (self.x[i] - px) * t, py + (self.y[i] - py) * t
+
+    def update(self, state, events):
+        """Advance every hazard one tick and hurt the player on contact"""
+        level = state.level
+        width = self.width
+        damage = self.damage
+        xs, ys = self.x, self.y
+        countdown = self.countdown
+        for i in range(len(xs)):
+            countdown[i] -= 1
+            if countdown[i]:
+                continue
+            countdown[i] = self.interval[i]
+            x, y = xs[i], ys[i]
+            self.prev_x[i], self.prev_y[i] = x, y
+
+            nx, ny = PATTERNS[self.pattern[i]](self, i, level)
+            if (nx, ny) == (x, y):
+                continue
+            hit = HAZARD_DAMAGE[self.kind[i]]
+            damage[y * width + x] -= hit
+            damage[ny * width + nx] += hit
+            xs[i], ys[i] = nx, ny
+
+            if nx == state.x and ny == state.y and state.status == PLAYING:
+                state.health -= hit
+                events.append(EV_HURT)
+                if state.health <= 0:
+                    state.status = GAME_OVER
+                    events.append(EV_GAME_OVER)
@@ -0,0 +1,171 @@
+"""Procedural level generator for Elemental Shift.
+
+Candidates are random walled boards with Fire, Water, Earth, Air and inner
+walls scattered over them, a start and an exit. Each one is checked by
+elemental_solver in a worker process:
+
+    unsolvable  no solution within the band's par (or the node budget)
+    trivial     just as short without ammo, so the elements don't matter
+    too easy    solvable, but in fewer moves than the band asks for
+
+Survivors get their certified par and go into a level pack. Workers build
+their own candidates from (seed, index), so only a few ints cross the
+process boundary each way and throughput scales with the cores available.
+The same seed always gives the same levels.
+
+    python level_generator.py --count 1000 --band medium
+"""
+import functools
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import build_pack, generator_parser
+
+from elemental_core import EMPTY, FIRE, WATER, EARTH, AIR, EXIT, WALL, state_from_level
+from elemental_solver import Solver
+
+# Difficulty bands: inclusive par range, and how cluttered the board is
+# (scales the Wall and Earth shares below); longer pars need more in the way
+BANDS = {
+    "easy": (8, 11, 1.0),
+    "medium": (12, 15, 1.8),
+    "hard": (16, 20, 1.8),
+}
+
+# Share of the inner cells given to each element
+MIX = ((WALL, 0.11), (EARTH, 0.14), (FIRE, 0.06), (WATER, 0.06), (AIR, 0.03))
+CLUTTER = (WALL, EARTH)
+
+MIN_AMMO, MAX_AMMO = 2, 6
+MAX_NODES = 20000  # Per search; candidates that need more are dropped
+
+# Verdicts
+ACCEPTED, UNSOLVABLE, TRIVIAL, TOO_EASY = range(4)
+VERDICT_NAMES = ("accepted", "unsolvable", "trivial", "too easy")
+
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+
+
+def random_level(rng, width=8, height=8, clutter=1.0):
+    """A walled board with a start and an exit at least half the board apart"""
+    mix = [(element, share * clutter if element in CLUTTER else share)
+           for element, share in MIX]
+    grid = [[WALL] * width for _ in range(height)]
+    inner = [(x, y) for y in range(1, height - 1) for x in range(1, width - 1)]
+    for x, y in inner:
+        roll = rng.random()
+        grid[y][x] = EMPTY
+        for element, share in mix:
+            if roll < share:
+                grid[y][x] = element
+                break
+            roll -= share
+
+    start = rng.choice(inner)
+    far = [cell for cell in inner
+           if abs(cell[0] - start[0]) + abs(cell[1] - start[1]) >= (width + height) // 2 - 1]
+    exit_x, exit_y = rng.choice(far or inner)
+    grid[start[1]][start[0]] = EMPTY
+    grid[exit_y][exit_x] = EXIT
+    return {
+        "grid": grid,
+        "start": start,
+        "ammo": rng.randint(MIN_AMMO, MAX_AMMO),
+    }
+
+
+def wall_distance(level):
+    """Steps to the exit if only walls were in the way, or None
+
+    Swaps can clear anything else but walls and exits never move, so this
+    is a lower bound on par and None proves a board unsolvable for free.
+    """
+    grid = level["grid"]
+    height, width = len(grid), len(grid[0])
+    frontier = [tuple(level["start"])]
+    seen = set(frontier)
+    distance = 0
+    while frontier:
+        next_frontier = []
+        for x, y in frontier:
+            if grid[y][x] == EXIT:
+                return distance
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if (0 <= nx < width and 0 <= ny < height and
+                        grid[ny][nx] != WALL and (nx, ny) not in seen):
+                    seen.add((nx, ny))
+                    next_frontier.append((nx, ny))
+        frontier = next_frontier
+        distance += 1
+    return None
+
+
+def shortest(level, max_depth, max_nodes=MAX_NODES):
+    """Length of the optimal solution, or None"""
+    actions = Solver(state_from_level(level), max_depth=max_depth, max_nodes=max_nodes).solve()
+    return None if actions is None else len(actions)
+
+
+def try_candidate(index, seed, band, width, height):
+    """Build candidate index of a run and judge it: (verdict, level or None)"""
+    low, high, clutter = BANDS[band]
+    level = random_level(random.Random(seed * 2**32 + index), width, height, clutter)
+
+    bound = wall_distance(level)
+    if bound is None or bound > high:
+        return UNSOLVABLE, None
+    par = shortest(level, high)
+    if par is None:
+        return UNSOLVABLE, None
+    if par < low:
+        return TOO_EASY, None
+    # A search without ammo only has to beat par, so it stays small
+    walk = shortest(dict(level, ammo=0), par)
+    if walk is not None:
+        return TRIVIAL, None
+
+    level["par"] = par
+    return ACCEPTED, level
+
+
+def generate(count, band="medium", seed=0, width=8, height=8, workers=None, report=None):
+    """count verified levels from band, in candidate order
+
+    report, if given, is called with the verdict tallies after every batch.
+    """
+    judge = functools.partial(try_candidate, seed=seed, band=band, width=width, height=height)
+    workers = workers or os.cpu_count() or 1
+    batch = workers * 64
+    tallies = [0] * len(VERDICT_NAMES)
+    levels = []
+    index = 0
+    with ProcessPoolExecutor(workers) as pool:
+        while len(levels) < count:
+            results = pool.map(judge, range(index, index + batch), chunksize=16)
+            for verdict, level in results:
+                tallies[verdict] += 1
+                if verdict == ACCEPTED and len(levels) < count:
+                    level["name"] = f"{band.title()} {len(levels) + 1}"
+                    levels.append(level)
+            index += batch
+            if report is not None:
+                report(tallies)
+    return levels
+
+
+def main(argv=None):
+    parser = generator_parser(__doc__.splitlines()[0], PACK_PATH)
+    parser.add_argument("--band", choices=BANDS, default="medium")
+    args = parser.parse_args(argv)
+    return build_pack(
+        args.out,
+        lambda report: generate(args.count, args.band, args.seed, args.size, args.size,
+                                args.workers, report),
+        VERDICT_NAMES, f"{args.band} levels")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
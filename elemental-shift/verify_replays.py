@@ -0,0 +1,89 @@
+"""Headless replay checker for Elemental Shift.
+
+Fast-forwards recorded runs (see common/replay.py) through the rules
+engine with no window and no pacing, and reports how each one ended. A
+run is valid when every byte is a real action, undo, redo or tick,
+nothing follows the end of the level, and the level was actually
+completed.
+
+    python verify_replays.py replays/          # a folder, or replay files
+    python verify_replays.py --workers 8 submitted/
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import load_levels
+from common.replay import WAIT, decode, verify_main
+
+from elemental_core import (
+    ACTIONS, LEVEL_COMPLETE, LEVELS, PLAYING, REACTIONS_PER_TICK, UNDO, REDO, Journal,
+    state_from_level, step, tick, undo, redo,
+)
+
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+
+# Verdicts
+COMPLETE, UNFINISHED, INVALID = range(3)
+VERDICT_NAMES = ("complete", "unfinished", "invalid")
+
+_levels = None
+
+
+def levels():
+    """The game's level source, opened once per process"""
+    global _levels
+    if _levels is None:
+        _levels = load_levels(PACK_PATH, LEVELS)
+    return _levels
+
+
+def replay(data, level_source=None):
+    """Rebuild the run in data: (verdict, final state or None)"""
+    level_source = levels() if level_source is None else level_source
+    try:
+        level_num, seed, body = decode(data)
+    except ValueError:
+        return INVALID, None
+    if level_num >= len(level_source):
+        return INVALID, None
+
+    state = state_from_level(level_source[level_num], random.Random(seed))
+    state.reaction_budget = REACTIONS_PER_TICK
+    state.journal = Journal()
+    events = []
+    for op in body:
+        if state.status != PLAYING:
+            return INVALID, state  # Input after the level ended
+        if op >= WAIT:
+            for _ in range(op - WAIT + 1):
+                tick(state, events)
+            events.clear()
+        elif op in ACTIONS:
+            step(state, op)
+        elif op == UNDO:
+            undo(state)
+        elif op == REDO:
+            redo(state)
+        else:
+            return INVALID, state
+    return (COMPLETE if state.status == LEVEL_COMPLETE else UNFINISHED), state
+
+
+def check_file(path):
+    """(path, verdict, moves, ticks) for one replay file"""
+    with open(path, "rb") as f:
+        verdict, state = replay(f.read())
+    if state is None:
+        return path, verdict, None, None
+    return path, verdict, state.moves, state.ticks
+
+
+def main(argv=None):
+    return verify_main(__doc__.splitlines()[0], check_file, VERDICT_NAMES, INVALID,
+                       "({} moves, {} ticks)", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Distance-to-goal tables for Neon Grid levels.
+
+One backwards breadth-first search from every goal state (both particles
+on their goals, any phase or entangle flags) labels each packed state with
+the number of moves still needed from it, in an array of 16-bit counts
+indexed by packed state: 64 KB on the 8x8 board. After that, during play:
+
+    distance(table, state)      moves left, None if the goal is out of reach
+    hint(board, table, state)   an optimal next action, E included
+
+are single lookups. The search walks the move graph backwards, so it first
+runs every move forwards once and files each successor's predecessors in
+flat arrays. E is free, as in the solver, so a state and its entangle twin
+always share a distance.
+
+Tables are saved under CACHE_DIR keyed by a hash of the level, so a level
+costs one search ever, not one per launch; with a read-only cache the
+table is just kept in memory. load_table_async does the same on a
+background thread, for games that shouldn't wait on a first search. Run
+directly to warm the cache for the built-in levels or a level pack:
+
+    python distance_table.py [levels.pack]
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import LevelPack
+
+from quantum_core import BLOCKED, ENTANGLE, LEVELS, compile_level
+from quantum_solver import MAX_STATE_BITS
+
+# Bump when the rules change so stale tables are ignored
+TABLE_VERSION = 2
+
+UNREACHABLE = 0xFFFF
+MAX_DISTANCE = UNREACHABLE - 1
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pypuzzle", "distances")
+
+DIRECTIONS = range(4)
+
+
+def level_key(board):
+    """Hex digest of everything a table depends on"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(bytes((TABLE_VERSION, board.width, board.height)))
+    digest.update(bytes(cell for row in board.grid for cell in row))
+    digest.update(board.goal.to_bytes(8, "little"))
+    return digest.hexdigest()
+
+
+def predecessors(board):
+    """(starts, sources): sources[starts[s]:starts[s + 1]] are the states one move before s"""
+    size = 1 << board.state_bits
+    cells = board.width * board.height
+    pos_mask, shift = board.pos_mask, board.blue_shift
+    move = board.move
+
+    successors = array("i", [BLOCKED]) * (4 * size)
+    starts = array("i", bytes(4 * (size + 1)))
+    for state in range(size):
+        if state & pos_mask >= cells or (state >> shift) & pos_mask >= cells:
+            continue  # Not a board position
+        for direction in DIRECTIONS:
+            new_state = move(state, direction)
+            if new_state != BLOCKED:
+                successors[4 * state + direction] = new_state
+                starts[new_state + 1] += 1
+
+    for state in range(size):
+        starts[state + 1] += starts[state]
+    sources = array("i", bytes(4 * starts[size]))
+    fill = array("i", starts)
+    for edge, new_state in enumerate(successors):
+        if new_state != BLOCKED:
+            sources[fill[new_state]] = edge >> 2
+            fill[new_state] += 1
+    return starts, sources
+
+
+def build_table(board):
+    """Moves-to-goal for every packed state, UNREACHABLE where there's no way"""
+    if board.state_bits > MAX_STATE_BITS:
+        raise ValueError(f"board too large for a distance table ({board.state_bits} state bits)")
+
+    starts, sources = predecessors(board)
+    ent = board.entangled_bit
+    table = array("H", [UNREACHABLE]) * (1 << board.state_bits)
+
+    # Goal checks ignore the flag bits, so every flag combination is a goal
+    flag_shift = 2 * board.bits
+    frontier = [board.goal | (flags << flag_shift) for flags in range(8)]
+    for state in frontier:
+        table[state] = 0
+
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for state in frontier:
+            for source in sources[starts[state]:starts[state + 1]]:
+                if table[source] == UNREACHABLE:
+                    table[source] = distance
+                    next_frontier.append(source)
+                    twin = source ^ ent
+                    if table[twin] == UNREACHABLE:
+                        table[twin] = distance
+                        next_frontier.append(twin)
+        if next_frontier and distance > MAX_DISTANCE:
+            raise ValueError(f"level needs more than {MAX_DISTANCE} moves from some states")
+        frontier = next_frontier
+    return table
+
+
+def load_table(board, cache_dir=CACHE_DIR):
+    """The level's table from the disk cache, built and saved on a miss"""
+    path = os.path.join(cache_dir, level_key(board) + ".dist")
+    table = array("H")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) == table.itemsize << board.state_bits:
+            table.frombytes(data)
+            return table
+    except OSError:
+        pass
+
+    table = build_table(board)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            table.tofile(f)
+        os.replace(temp, path)
+    except OSError:
+        pass  # Read-only cache: search again next launch
+    return table
+
+
+def load_table_async(board, done=None, cache_dir=CACHE_DIR):
+    """load_table on a daemon thread; returns a Future of the table
+
+    done, if given, is called with no arguments on that thread once the
+    Future is set, whether the table was built or raised ValueError.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(load_table(board, cache_dir))
+        except ValueError as e:
+            future.set_exception(e)
+        if done is not None:
+            done()
+
+    threading.Thread(target=run, name="distances", daemon=True).start()
+    return future
+
+
+def distance(table, state):
+    """Moves left to the goal, or None if it can't be reached any more"""
+    moves = table[state]
+    return None if moves == UNREACHABLE else moves
+
+
+def hint(board, table, state):
+    """An action on an optimal path from state, or None at or past the goal"""
+    moves = table[state]
+    if moves == UNREACHABLE or moves == 0:
+        return None
+    for candidate, action in ((state, None), (state ^ board.entangled_bit, ENTANGLE)):
+        for direction in DIRECTIONS:
+            new_state = board.move(candidate, direction)
+            if new_state != BLOCKED and table[new_state] < moves:
+                return direction if action is None else action
+    return None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    levels = LevelPack(argv[0]) if argv else LEVELS
+    for level_num, data in enumerate(levels):
+        board, start = compile_level(data)
+        started = time.perf_counter()
+        table = load_table(board)
+        elapsed = (time.perf_counter() - started) * 1000
+        reachable = sum(1 for moves in table if moves != UNREACHABLE)
+        print(f"{level_num}: {data['name']}: par {distance(table, start)}, "
+              f"{reachable} solvable states ({elapsed:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Procedural level generator for Neon Grid.
+
+Candidates are random boards with walls, swap gates and phase gates, plus
+red and blue starts and goals on empty cells. Each one is solved in a
+worker process with quantum_solver, then solved again with the swap gates
+taken out and with E disabled. A board needs a mechanic when the optimal
+solution gets longer (or impossible) without it, and only boards that need
+at least one of the required mechanics are kept:
+
+    unsolvable  no solution at all
+    plain       solvable just as fast without swap gates and without E
+    too short   fewer moves than --min-moves
+    duplicate   a rotation or mirror image of a board already kept
+
+Duplicates are caught by a canonical hash: the smallest encoding of the
+board, starts and goals over all of its rotations and reflections.
+Survivors go into a level pack with their par.
+
+    python level_generator.py --count 1000 --min-moves 8
+"""
+import functools
+import hashlib
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import build_pack, generator_parser
+
+from quantum_core import EMPTY, SWAP_GATE, PHASE_GATE, WALL, Board, compile_level
+from quantum_solver import MAX_STATE_BITS, solve, move_count
+
+# Share of the cells given to each kind
+MIX = ((WALL, 0.14), (SWAP_GATE, 0.03), (PHASE_GATE, 0.03))
+
+# Mechanics a board can need
+SWAP, ENTANGLE = "swap", "entangle"
+MECHANICS = (SWAP, ENTANGLE)
+
+# Verdicts
+ACCEPTED, UNSOLVABLE, PLAIN, TOO_SHORT, DUPLICATE = range(5)
+VERDICT_NAMES = ("accepted", "unsolvable", "plain", "too short", "duplicate")
+
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+
+
+def random_level(rng, width=8, height=8):
+    grid = [[EMPTY] * width for _ in range(height)]
+    for row in grid:
+        for x in range(width):
+            roll = rng.random()
+            for cell, share in MIX:
+                if roll < share:
+                    row[x] = cell
+                    break
+                roll -= share
+
+    empty = [(x, y) for y in range(height) for x in range(width) if grid[y][x] == EMPTY]
+    if len(empty) < 4:
+        return None
+    red_start, blue_start, red_goal, blue_goal = rng.sample(empty, 4)
+    return {
+        "grid": grid,
+        "red_start": red_start,
+        "blue_start": blue_start,
+        "red_goal": red_goal,
+        "blue_goal": blue_goal,
+    }
+
+
+def symmetries(width, height):
+    """Cell maps (x, y) -> (x, y) for every rotation and mirror of the board
+
+    Each comes with the transformed board's width and height. Square boards
+    have eight, others only the four that keep the shape.
+    """
+    w, h = width - 1, height - 1
+    maps = [
+        (width, height, lambda x, y: (x, y)),
+        (width, height, lambda x, y: (w - x, y)),
+        (width, height, lambda x, y: (x, h - y)),
+        (width, height, lambda x, y: (w - x, h - y)),
+    ]
+    if width == height:
+        maps += [
+            (height, width, lambda x, y: (y, x)),
+            (height, width, lambda x, y: (h - y, x)),
+            (height, width, lambda x, y: (y, w - x)),
+            (height, width, lambda x, y: (h - y, w - x)),
+        ]
+    return maps
+
+
+def canonical_key(level):
+    """Same digest for a level and any rotation or mirror image of it"""
+    grid = level["grid"]
+    height, width = len(grid), len(grid[0])
+    positions = [level[key] for key in ("red_start", "blue_start", "red_goal", "blue_goal")]
+    encodings = []
+    for new_width, new_height, transform in symmetries(width, height):
+        cells = bytearray(new_width * new_height)
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                nx, ny = transform(x, y)
+                cells[ny * new_width + nx] = cell
+        for x, y in positions:
+            cells.extend(transform(x, y))
+        encodings.append(bytes((new_width, new_height)) + bytes(cells))
+    return hashlib.blake2b(min(encodings), digest_size=16).digest()
+
+
+def shortest(board, start, entangle=True):
+    """Optimal move count, or None if unsolvable"""
+    actions = solve(board, start, entangle)
+    return None if actions is None else move_count(actions)
+
+
+def needed_mechanics(level, par):
+    """The mechanics the level can't be solved in par moves without"""
+    needs = []
+    no_swaps = [[EMPTY if cell == SWAP_GATE else cell for cell in row] for row in level["grid"]]
+    board, start = compile_level(dict(level, grid=no_swaps))
+    moves = shortest(board, start)
+    if moves is None or moves > par:
+        needs.append(SWAP)
+
+    board, start = compile_level(level)
+    moves = shortest(board, start, entangle=False)
+    if moves is None or moves > par:
+        needs.append(ENTANGLE)
+    return needs
+
+
+def try_candidate(index, seed, width, height, min_moves, require):
+    """Build candidate index of a run and judge it: (verdict, level, key)"""
+    level = random_level(random.Random(seed * 2**32 + index), width, height)
+    if level is None:
+        return UNSOLVABLE, None, None
+
+    board, start = compile_level(level)
+    par = shortest(board, start)
+    if par is None:
+        return UNSOLVABLE, None, None
+    if par < min_moves:
+        return TOO_SHORT, None, None
+    needs = needed_mechanics(level, par)
+    if not any(mechanic in needs for mechanic in require):
+        return PLAIN, None, None
+
+    level["par"] = par
+    level["needs"] = needs
+    return ACCEPTED, level, canonical_key(level)
+
+
+def generate(count, seed=0, width=8, height=8, min_moves=0, require=MECHANICS,
+             workers=None, report=None):
+    """count distinct certified levels, in candidate order
+
+    report, if given, is called with the verdict tallies after every batch.
+    """
+    probe = Board([[EMPTY] * width for _ in range(height)], (0, 0), (0, 0))
+    if probe.state_bits > MAX_STATE_BITS:
+        raise ValueError(f"{width}x{height} is too big for the dense solver")
+
+    judge = functools.partial(try_candidate, seed=seed, width=width, height=height,
+                              min_moves=min_moves, require=tuple(require))
+    workers = workers or os.cpu_count() or 1
+    batch = workers * 16
+    tallies = [0] * len(VERDICT_NAMES)
+    seen = set()
+    levels = []
+    index = 0
+    with ProcessPoolExecutor(workers) as pool:
+        while len(levels) < count:
+            results = pool.map(judge, range(index, index + batch), chunksize=4)
+            for verdict, level, key in results:
+                if verdict == ACCEPTED and key in seen:
+                    verdict = DUPLICATE
+                tallies[verdict] += 1
+                if verdict == ACCEPTED and len(levels) < count:
+                    seen.add(key)
+                    level["name"] = f"Generated {len(levels) + 1}"
+                    levels.append(level)
+            index += batch
+            if report is not None:
+                report(tallies)
+    return levels
+
+
+def main(argv=None):
+    parser = generator_parser(__doc__.splitlines()[0], PACK_PATH)
+    parser.add_argument("--min-moves", type=int, default=0)
+    parser.add_argument("--require", nargs="+", choices=MECHANICS, default=list(MECHANICS),
+                        help="keep boards that need any of these (default: either)")
+    args = parser.parse_args(argv)
+    return build_pack(
+        args.out,
+        lambda report: generate(args.count, args.seed, args.size, args.size, args.min_moves,
+                                args.require, args.workers, report),
+        VERDICT_NAMES)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
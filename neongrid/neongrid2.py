@@ -1,18 +1,49 @@
 import pygame
 import sys
-from pygame import mixer
+import os
+import time
 
-# Initialize Pygame
-pygame.init()
-mixer.init()
+# Shared helpers live in the repo-level common package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.dirty import DirtyRects
+from common.text import render_text
+from common.loop import next_events, EXPOSE_EVENTS
+from common.camera import Camera
+from common.levelpack import load_levels
+from common.replay import Recorder
+from common.startup import LazyFont, init_display, startup_timer
+from common.profiler import FrameProfiler
+
+# Levels and the bitboard rules live in the headless core
+from quantum_core import (
+    SWAP_GATE, PHASE_GATE, WALL,
+    LEFT, RIGHT, UP, DOWN, ENTANGLE, BLOCKED, LEVELS, compile_level,
+)
+from quantum_solver import ACTION_NAMES
+from distance_table import load_table_async, distance, hint
 
 # Constants
 WIDTH, HEIGHT = 800, 650
-GRID_SIZE = 8
 TILE_SIZE = 70
-GRID_OFFSET_X = (WIDTH - GRID_SIZE * TILE_SIZE) // 2
-GRID_OFFSET_Y = (HEIGHT - GRID_SIZE * TILE_SIZE) // 2 - 20
+VIEW_TILES = 8  # Bigger boards scroll to keep the particles in view
+BOARD_CENTER = (WIDTH // 2, HEIGHT // 2 - 20)
 FPS = 60
+EVENT_DRIVEN = True  # False ticks at FPS every frame, even when idle
+# Level pack shipped next to the game; the built-in LEVELS are the fallback
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+# Every finished level's replay is saved here (None to keep them in memory)
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+# Print how long each start-up phase took once the first frame is up
+STARTUP_REPORT = bool(os.environ.get("PYPUZZLE_STARTUP_REPORT"))
+# Time every frame phase; F3 shows p50/p99 times, F4 saves a Chrome trace
+PROFILE = True
+TRACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frame_trace.json")
+PROFILER_KEY, TRACE_KEY = pygame.K_F3, pygame.K_F4
+# Largest board (in state bits) whose distance table is built while playing:
+# 19 bits is 16x16, a few seconds' search; bigger boards go without hints
+MAX_TABLE_BITS = 19
+# Posted when a level's distance table is ready, to wake the idle loop
+TABLE_READY = pygame.event.custom_type()
 
 # Colors
 BLACK = (0, 0, 0)
@@ -27,188 +58,311 @@ GRAY = (100, 100, 100)   # Walls
 # Game states
 MENU, PLAYING, LEVEL_COMPLETE = 0, 1, 2
 
-# Setup screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Neon Grid: Quantum Pathfinder")
+# The window and the sprites converted to its pixel format; nothing is
+# initialised at import, setup_display() (called by main()) creates them.
+# Neon Grid has no sound, so the mixer never starts
+screen = None
 clock = pygame.time.Clock()
+dirty = DirtyRects()
+profiler = FrameProfiler(enabled=PROFILE)
+
+# Fonts open on their first render
+font_large = LazyFont(72)
+font_medium = LazyFont(36)
+font_small = LazyFont(24)
+font_profiler = LazyFont(16)
+
+# Region the HUD text is drawn into (overlaps the board)
+HUD_RECT = pygame.Rect(0, 0, WIDTH, 85)
+
+CELL_COLORS = {
+    SWAP_GATE: PURPLE,
+    PHASE_GATE: GREEN,
+    WALL: GRAY,
+}
+
+def build_cell_sprites():
+    """One pre-converted surface per cell type, grid line included"""
+    sprites = {}
+    for cell in range(4):
+        sprite = pygame.Surface((TILE_SIZE, TILE_SIZE)).convert()
+        sprite.fill(CELL_COLORS.get(cell, BLACK))
+        pygame.draw.rect(sprite, (50, 50, 50), sprite.get_rect(), 1)  # Grid lines
+        sprites[cell] = sprite
+    return sprites
+
+CELL_SPRITES = None
+
+def setup_display():
+    """Open the window and build everything that needs its pixel format"""
+    global screen, CELL_SPRITES
+    screen = init_display((WIDTH, HEIGHT), "Neon Grid: Quantum Pathfinder")
+    with startup_timer.phase("sprites"):
+        CELL_SPRITES = build_cell_sprites()
+    return screen
 
-# Fonts
-font_large = pygame.font.SysFont("Arial", 72)
-font_medium = pygame.font.SysFont("Arial", 36)
-font_small = pygame.font.SysFont("Arial", 24)
+def post_table_ready():
+    """Wake the main loop from the table's thread (a no-op without a window)"""
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(TABLE_READY))
 
 class QuantumGame:
     def __init__(self):
         self.state = MENU
         self.current_level = 0
+        self.levels = load_levels(PACK_PATH, LEVELS)
+        self.drawn_state = None  # Forces a full redraw on the next frame
         self.load_level(self.current_level)
         
     def load_level(self, level_num):
-        self.red_pos = [1, 1]  # Starting positions
-        self.blue_pos = [6, 6]
+        data = self.levels[level_num]
+        self.board, self.packed = compile_level(data)
+        self.level = self.board.grid
         self.moves = 0
-        self.red_phased = False
-        self.blue_phased = False
-        self.entangled = False
+        self.recorder = Recorder(level_num)  # No randomness, so no seed
+        self.red_goal = list(data["red_goal"])
+        self.blue_goal = list(data["blue_goal"])
+        self.level_name = data["name"]
         
-        if level_num == 0:  # Tutorial
-            self.level = [
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 1, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 2, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0]
-            ]
-            self.red_goal = [7, 6]
-            self.blue_goal = [2, 1]
-            self.level_name = "Tutorial: Basic Movement"
+        # Moves-to-goal for every state, cached on disk per level: hints,
+        # the stuck warning and par are all lookups in it. A missing table
+        # is built on a background thread and they stay off until it's
+        # ready; boards too big for one go without
+        self.start_packed = self.packed
+        self.distances = None
+        self.pending_distances = None
+        if self.board.state_bits <= MAX_TABLE_BITS:
+            self.pending_distances = load_table_async(self.board, done=post_table_ready)
+        self.par = data.get("par")
+        self.show_hint = False
+        self.drawn_state = None
         
-        elif level_num == 1:  # Swap Gate
-            self.level = [
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 1, 0, 0, 0, 0, 0],
-                [0, 0, 0, 3, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 2, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0]
-            ]
-            self.red_goal = [6, 1]
-            self.blue_goal = [1, 6]
-            self.level_name = "Level 1: Quantum Swap"
+        self.camera = Camera(self.board.width, self.board.height, TILE_SIZE,
+                             VIEW_TILES, VIEW_TILES, BOARD_CENTER)
+        self.camera.follow(*self.focus())
+        self.build_board_layer()
+    
+    def build_board_layer(self):
+        """Render the visible cells plus the goal rings, which never change"""
+        camera = self.camera
+        self.board_layer = pygame.Surface(camera.view.size).convert()
+        self.board_layer.fill(BLACK)
+        x0, y0, x1, y1 = camera.visible_range()
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                self.board_layer.blit(CELL_SPRITES[self.level[y][x]],
+                                      ((x - x0) * TILE_SIZE, (y - y0) * TILE_SIZE))
+        for color, goal in ((RED, self.red_goal), (BLUE, self.blue_goal)):
+            pygame.draw.circle(
+                self.board_layer, color,
+                ((goal[0] - x0) * TILE_SIZE + TILE_SIZE//2, (goal[1] - y0) * TILE_SIZE + TILE_SIZE//2),
+                TILE_SIZE//3, 2
+            )
+    
+    def focus(self):
+        """Cell the camera follows: halfway between the particles"""
+        (rx, ry), (bx, by) = self.red_pos, self.blue_pos
+        return (rx + bx) // 2, (ry + by) // 2
+    
+    def scroll(self):
+        """Keep the particles in view; True if the board layer was rebuilt"""
+        if not self.camera.follow(*self.focus()):
+            return False
+        self.build_board_layer()
+        return True
+
+    # The particles live in one packed int; unpack for drawing only
+    @property
+    def red_pos(self):
+        return self.board.unpack(self.packed)[0]
+
+    @property
+    def blue_pos(self):
+        return self.board.unpack(self.packed)[1]
+
+    @property
+    def entangled(self):
+        return self.board.unpack(self.packed)[4]
+    
+    def check_distances(self):
+        """Take the level's distance table once its background build is done"""
+        future = self.pending_distances
+        if future is None or not future.done():
+            return
+        self.pending_distances = None
+        try:
+            self.distances = future.result()
+        except ValueError:
+            return  # Some states are too far from the goal to count
+        if self.par is None:
+            self.par = distance(self.distances, self.start_packed)
     
     def draw(self):
+        self.check_distances()
+        # The menu and the complete overlay are static: draw once per state
+        if self.state != self.drawn_state:
+            self.draw_full()
+            return
+        
+        if self.state == PLAYING:
+            for rect in self.changed_regions():
+                self.draw_region(rect)
+    
+    def draw_full(self):
+        self.scroll()
         screen.fill(BLACK)
         
         if self.state == MENU:
-            title = font_large.render("NEON GRID", True, PURPLE)
-            subtitle = font_medium.render("Quantum Pathfinder", True, WHITE)
-            start = font_medium.render("Press E to toggle mirrored/opposite movement. Press SPACE to Begin", True, GREEN)
+            title = render_text(font_large, "NEON GRID", PURPLE)
+            subtitle = render_text(font_medium, "Quantum Pathfinder", WHITE)
+            start = render_text(font_medium, "Press E to toggle mirrored/opposite movement. Press SPACE to Begin", GREEN)
+            hint_keys = render_text(font_small, "Stuck? Press H for a hint", WHITE)
             
             screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//3))
             screen.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, HEIGHT//3 + 80))
             screen.blit(start, (WIDTH//2 - start.get_width()//2, HEIGHT//2))
+            screen.blit(hint_keys, (WIDTH//2 - hint_keys.get_width()//2, HEIGHT//2 + 60))
         
         elif self.state == PLAYING or self.state == LEVEL_COMPLETE:
-            # Draw grid
-            for y in range(GRID_SIZE):
-                for x in range(GRID_SIZE):
-                    rect = pygame.Rect(
-                        GRID_OFFSET_X + x * TILE_SIZE,
-                        GRID_OFFSET_Y + y * TILE_SIZE,
-                        TILE_SIZE, TILE_SIZE
-                    )
-                    
-                    # Draw gates/walls
-                    cell = self.level[y][x]
-                    if cell == 1:  # Swap Gate
-                        pygame.draw.rect(screen, PURPLE, rect)
-                    elif cell == 2:  # Phase Gate
-                        pygame.draw.rect(screen, GREEN, rect)
-                    elif cell == 3:  # Wall
-                        pygame.draw.rect(screen, GRAY, rect)
-                    
-                    pygame.draw.rect(screen, (50, 50, 50), rect, 1)  # Grid lines
-            
-            # Draw goals
-            pygame.draw.circle(
-                screen, RED, 
-                (GRID_OFFSET_X + self.red_goal[0] * TILE_SIZE + TILE_SIZE//2,
-                 GRID_OFFSET_Y + self.red_goal[1] * TILE_SIZE + TILE_SIZE//2),
-                TILE_SIZE//3, 2
-            )
-            pygame.draw.circle(
-                screen, BLUE, 
-                (GRID_OFFSET_X + self.blue_goal[0] * TILE_SIZE + TILE_SIZE//2,
-                 GRID_OFFSET_Y + self.blue_goal[1] * TILE_SIZE + TILE_SIZE//2),
-                TILE_SIZE//3, 2
-            )
-            
-            # Draw particles
-            pygame.draw.circle(
-                screen, RED,
-                (GRID_OFFSET_X + self.red_pos[0] * TILE_SIZE + TILE_SIZE//2,
-                 GRID_OFFSET_Y + self.red_pos[1] * TILE_SIZE + TILE_SIZE//2),
-                TILE_SIZE//3
-            )
-            pygame.draw.circle(
-                screen, BLUE,
-                (GRID_OFFSET_X + self.blue_pos[0] * TILE_SIZE + TILE_SIZE//2,
-                 GRID_OFFSET_Y + self.blue_pos[1] * TILE_SIZE + TILE_SIZE//2),
-                TILE_SIZE//3
-            )
-            
-            # Draw UI
-            level_text = font_small.render(self.level_name, True, WHITE)
-            moves_text = font_small.render(f"Moves: {self.moves}", True, WHITE)
-            screen.blit(level_text, (20, 20))
-            screen.blit(moves_text, (20, 50))
+            self.draw_layers()
             
             if self.state == LEVEL_COMPLETE:
-                overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 180))
-                screen.blit(overlay, (0, 0))
-                
-                complete = font_large.render("LEVEL COMPLETE!", True, GREEN)
-                next_text = font_medium.render("Press SPACE to continue", True, WHITE)
-                screen.blit(complete, (WIDTH//2 - complete.get_width()//2, HEIGHT//2 - 50))
-                screen.blit(next_text, (WIDTH//2 - next_text.get_width()//2, HEIGHT//2 + 50))
+                with profiler.phase("overlay"):
+                    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+                    overlay.fill((0, 0, 0, 180))
+                    screen.blit(overlay, (0, 0))
+                    
+                    complete = render_text(font_large, "LEVEL COMPLETE!", GREEN)
+                    next_text = render_text(font_medium, "Press SPACE to continue", WHITE)
+                    screen.blit(complete, (WIDTH//2 - complete.get_width()//2, HEIGHT//2 - 50))
+                    screen.blit(next_text, (WIDTH//2 - next_text.get_width()//2, HEIGHT//2 + 50))
+        
+        self.drawn_state = self.state
+        self.drawn_packed = self.packed
+        self.drawn_hud = self.hud_values()
+        dirty.invalidate()
+    
+    def draw_region(self, rect):
+        """Redraw everything that overlaps rect and queue it for display"""
+        screen.set_clip(rect)
+        screen.fill(BLACK)
+        self.draw_layers(rect)
+        screen.set_clip(None)
+        dirty.add(rect)
+    
+    def draw_layers(self, area=None):
+        """Grid, then particles, then HUD, each timed by the profiler"""
+        with profiler.phase("board"):
+            self.draw_grid(area)
+        with profiler.phase("entities"):
+            self.draw_pieces()
+        with profiler.phase("hud"):
+            self.draw_hud()
     
-    def move_particles(self, dx, dy):
-        if self.entangled:
-            dx, dy = -dx, -dy  # Reverse for blue particle
+    def changed_regions(self):
+        """Screen rects whose contents changed since they were last drawn"""
+        camera = self.camera
+        regions = []
         
-        # Try to move red particle
-        new_red_x = self.red_pos[0] + dx
-        new_red_y = self.red_pos[1] + dy
+        # Gates and walls never change; only the particles move
+        if self.packed != self.drawn_packed:
+            if self.scroll():
+                regions.append(camera.view)
+            else:
+                old = self.board.unpack(self.drawn_packed)
+                new = self.board.unpack(self.packed)
+                for pos in (old[0], old[1], new[0], new[1]):
+                    if camera.is_visible(*pos):
+                        regions.append(camera.tile_rect(*pos))
+            self.drawn_packed = self.packed
         
-        # Check if red can move
-        red_can_move = False
-        if 0 <= new_red_x < GRID_SIZE and 0 <= new_red_y < GRID_SIZE:
-            if self.level[new_red_y][new_red_x] != 3 or self.red_phased:  # Wall check
-                red_can_move = True
+        hud = self.hud_values()
+        if hud != self.drawn_hud:
+            regions.append(HUD_RECT)
+            self.drawn_hud = hud
         
-        # Try to move blue particle
-        new_blue_x = self.blue_pos[0] + (-dx if self.entangled else dx)
-        new_blue_y = self.blue_pos[1] + (-dy if self.entangled else dy)
+        return regions
+    
+    def draw_grid(self, area=None):
+        view = self.camera.view
+        if area is None:
+            screen.blit(self.board_layer, view)
+        else:
+            # Just the part of the layer under area
+            visible = area.clip(view)
+            if visible:
+                source = visible.move(-view.left, -view.top)
+                screen.blit(self.board_layer, visible.topleft, source)
+    
+    def draw_pieces(self):
+        # Draw particles; on big boards one can be out of view
+        camera = self.camera
+        for color, pos in ((RED, self.red_pos), (BLUE, self.blue_pos)):
+            if camera.is_visible(*pos):
+                pygame.draw.circle(screen, color, camera.tile_rect(*pos).center, TILE_SIZE//3)
+    
+    def hint_text(self):
+        if self.state != PLAYING:
+            return ""
+        if self.distances is None:
+            if self.show_hint and self.pending_distances is not None:
+                return "Hint: still thinking..."
+            return ""
+        moves = distance(self.distances, self.packed)
+        if moves is None:
+            return "No way to the goal from here"
+        if self.show_hint:
+            # None when already on the goal, e.g. a level that starts there
+            action = hint(self.board, self.distances, self.packed)
+            if action is not None:
+                return f"Hint: {ACTION_NAMES[action]} ({moves} to go)"
+        return ""
+    
+    def hud_values(self):
+        return (self.level_name, self.moves, self.par, self.hint_text())
+    
+    def draw_hud(self):
+        level_text = render_text(font_small, self.level_name, WHITE)
+        moves_line = f"Moves: {self.moves}"
+        if self.par is not None:
+            moves_line += f" (Par: {self.par})"
+        moves_text = render_text(font_small, moves_line, WHITE)
+        screen.blit(level_text, (20, 20))
+        screen.blit(moves_text, (20, 50))
         
-        # Check if blue can move
-        blue_can_move = False
-        if 0 <= new_blue_x < GRID_SIZE and 0 <= new_blue_y < GRID_SIZE:
-            if self.level[new_blue_y][new_blue_x] != 3 or self.blue_phased:  # Wall check
-                blue_can_move = True
+        hint_line = self.hint_text()
+        if hint_line:
+            hint_text = render_text(font_small, hint_line, YELLOW)
+            screen.blit(hint_text, (WIDTH - hint_text.get_width() - 20, 20))
+    
+    def busy(self):
+        """Nothing moves on its own here, so the loop can always sleep"""
+        return False
+    
+    def move_particles(self, direction):
+        self.recorder.action(direction)
+        new_state = self.board.move(self.packed, direction)
         
-        # If both can move, update positions
-        if red_can_move and blue_can_move:
-            self.red_pos = [new_red_x, new_red_y]
-            self.blue_pos = [new_blue_x, new_blue_y]
+        # Blocked if either particle would leave the grid or hit a wall
+        if new_state != BLOCKED:
+            self.packed = new_state
             self.moves += 1
             
-            # Check for gate interactions
-            self.check_gates()
+            # Check if both reached goals
+            if self.board.is_goal(self.packed):
+                self.state = LEVEL_COMPLETE
+                self.save_replay()
     
-    def check_gates(self):
-        # Check if red is on a gate
-        red_cell = self.level[self.red_pos[1]][self.red_pos[0]]
-        blue_cell = self.level[self.blue_pos[1]][self.blue_pos[0]]
-        
-        if red_cell == 1 or blue_cell == 1:  # Swap Gate
-            self.red_pos, self.blue_pos = self.blue_pos, self.red_pos
-        
-        if red_cell == 2:  # Phase Gate (red)
-            self.red_phased = not self.red_phased
-        
-        if blue_cell == 2:  # Phase Gate (blue)
-            self.blue_phased = not self.blue_phased
-        
-        # Check if both reached goals
-        if (self.red_pos == self.red_goal and 
-            self.blue_pos == self.blue_goal):
-            self.state = LEVEL_COMPLETE
+    def toggle_entangled(self):
+        self.recorder.action(ENTANGLE)
+        self.packed = self.board.toggle_entangled(self.packed)
+    
+    def save_replay(self):
+        if REPLAY_DIR is None:
+            return
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        name = f"level{self.recorder.level}-{time.time_ns():x}.rpl"
+        self.recorder.save(os.path.join(REPLAY_DIR, name))
     
     def handle_input(self, event):
         if event.type == pygame.KEYDOWN:
@@ -217,19 +371,21 @@ class QuantumGame:
             
             elif self.state == PLAYING:
                 if event.key == pygame.K_LEFT:
-                    self.move_particles(-1, 0)
+                    self.move_particles(LEFT)
                 elif event.key == pygame.K_RIGHT:
-                    self.move_particles(1, 0)
+                    self.move_particles(RIGHT)
                 elif event.key == pygame.K_UP:
-                    self.move_particles(0, -1)
+                    self.move_particles(UP)
                 elif event.key == pygame.K_DOWN:
-                    self.move_particles(0, 1)
+                    self.move_particles(DOWN)
                 elif event.key == pygame.K_e:  # Toggle entanglement
-                    self.entangled = not self.entangled
+                    self.toggle_entangled()
+                elif event.key == pygame.K_h:
+                    self.show_hint = not self.show_hint
             
             elif self.state == LEVEL_COMPLETE and event.key == pygame.K_SPACE:
                 self.current_level += 1
-                if self.current_level > 1:  # Only 2 levels in this demo
+                if self.current_level >= len(self.levels):
                     self.current_level = 0
                     self.state = MENU
                 else:
@@ -238,18 +394,46 @@ class QuantumGame:
 
 # Main game loop
 def main():
-    game = QuantumGame()
+    setup_display()
+    with startup_timer.phase("game"):
+        game = QuantumGame()
+    # Put the first frame up before waiting on anything
+    with startup_timer.phase("first frame"):
+        game.draw()
+        dirty.present()
+    if STARTUP_REPORT:
+        startup_timer.report()
     running = True
     
     while running:
-        for event in pygame.event.get():
+        # Sleep until input arrives unless something is animating
+        busy = not EVENT_DRIVEN or game.busy()
+        # A frame starts when the loop wakes up, not when it went to sleep
+        events = next_events(busy, clock, FPS, woke=profiler.begin_frame)
+        if events or busy:
+            profiler.mark("events")
+        else:
+            profiler.discard_frame()  # Idle wake-up with nothing to do
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
-            game.handle_input(event)
+            elif event.type in EXPOSE_EVENTS:
+                dirty.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == PROFILER_KEY:
+                profiler.show = not profiler.show
+                game.drawn_state = None  # Repaint what the overlay covered
+            elif event.type == pygame.KEYDOWN and event.key == TRACE_KEY:
+                profiler.export_trace(TRACE_PATH)
+            with profiler.phase("input"):
+                game.handle_input(event)
         
-        game.draw()
-        pygame.display.flip()
-        clock.tick(FPS)
+        with profiler.phase("draw"):
+            game.draw()
+        if profiler.show:
+            dirty.add(profiler.draw_overlay(screen, font_profiler, (10, HEIGHT - 10)))
+        with profiler.phase("flip"):
+            dirty.present()
+        profiler.end_frame()
     
     pygame.quit()
     sys.exit()
@@ -0,0 +1,193 @@
+"""Bitboard rules engine for Neon Grid.
+
+The board is compiled once per level into integer masks (one bit per cell,
+bit index y * width + x) and the whole game state packs into a single int:
+
+    bits 0 .. B-1      red position (cell index)
+    bits B .. 2B-1     blue position
+    bit  2B            red_phased
+    bit  2B+1          blue_phased
+    bit  2B+2          entangled
+
+where B is the number of bits needed for a cell index (6 on the 8x8 board).
+Packed states are plain ints, so they hash in constant time and moving
+allocates no lists. No pygame here, so solvers can import it freely.
+"""
+
+GRID_SIZE = 8
+
+# Cells
+EMPTY, SWAP_GATE, PHASE_GATE, WALL = 0, 1, 2, 3
+
+# Actions (ENTANGLE is the E key)
+LEFT, RIGHT, UP, DOWN, ENTANGLE = 0, 1, 2, 3, 4
+ACTIONS = (LEFT, RIGHT, UP, DOWN, ENTANGLE)
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+OPPOSITE = (RIGHT, LEFT, DOWN, UP)
+
+BLOCKED = -1
+
+LEVELS = [
+    {
+        "name": "Tutorial: Basic Movement",
+        "grid": [
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 2, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0]
+        ],
+        "red_start": (1, 1),
+        "blue_start": (6, 6),
+        "red_goal": (7, 6),
+        "blue_goal": (2, 1),
+    },
+    {
+        "name": "Level 1: Quantum Swap",
+        "grid": [
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 0, 0, 0, 0, 0],
+            [0, 0, 0, 3, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 2, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0]
+        ],
+        "red_start": (1, 1),
+        "blue_start": (6, 6),
+        "red_goal": (6, 1),
+        "blue_goal": (1, 6),
+    },
+]
+
+
+class Board:
+    """One level compiled to bit masks, plus the packed-state operations"""
+
+    def __init__(self, grid, red_goal, blue_goal):
+        self.grid = grid
+        self.height = len(grid)
+        self.width = len(grid[0])
+        cells = self.width * self.height
+        self.bits = max(1, (cells - 1).bit_length())
+        self.pos_mask = (1 << self.bits) - 1
+        self.blue_shift = self.bits
+        self.red_phased_bit = 1 << (2 * self.bits)
+        self.blue_phased_bit = 1 << (2 * self.bits + 1)
+        self.entangled_bit = 1 << (2 * self.bits + 2)
+        self.state_bits = 2 * self.bits + 3
+
+        self.walls = self.swaps = self.phases = 0
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                bit = 1 << (y * self.width + x)
+                if cell == WALL:
+                    self.walls |= bit
+                elif cell == SWAP_GATE:
+                    self.swaps |= bit
+                elif cell == PHASE_GATE:
+                    self.phases |= bit
+
+        # For each direction: index delta, and the mask of cells that stay on
+        # the board after moving that way
+        full = (1 << cells) - 1
+        left_file = right_file = 0
+        for y in range(self.height):
+            left_file |= 1 << (y * self.width)
+            right_file |= 1 << (y * self.width + self.width - 1)
+        top_rank = (1 << self.width) - 1
+        bottom_rank = top_rank << (cells - self.width)
+        self.deltas = (-1, 1, -self.width, self.width)
+        self.movable = (full & ~left_file, full & ~right_file,
+                        full & ~top_rank, full & ~bottom_rank)
+
+        self.goal = self.index(*red_goal) | (self.index(*blue_goal) << self.blue_shift)
+        self.goal_mask = self.pos_mask | (self.pos_mask << self.blue_shift)
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def coords(self, index):
+        return index % self.width, index // self.width
+
+    def pack(self, red, blue, red_phased=False, blue_phased=False, entangled=False):
+        state = self.index(*red) | (self.index(*blue) << self.blue_shift)
+        if red_phased:
+            state |= self.red_phased_bit
+        if blue_phased:
+            state |= self.blue_phased_bit
+        if entangled:
+            state |= self.entangled_bit
+        return state
+
+    def unpack(self, state):
+        """(red, blue, red_phased, blue_phased, entangled) for display code"""
+        return (self.coords(state & self.pos_mask),
+                self.coords((state >> self.blue_shift) & self.pos_mask),
+                bool(state & self.red_phased_bit),
+                bool(state & self.blue_phased_bit),
+                bool(state & self.entangled_bit))
+
+    def move(self, state, direction):
+        """Move both particles; returns the new state or BLOCKED"""
+        red = state & self.pos_mask
+        blue = (state >> self.blue_shift) & self.pos_mask
+
+        # Entangled: red moves the opposite way, blue as pressed
+        if state & self.entangled_bit:
+            red_dir = OPPOSITE[direction]
+        else:
+            red_dir = direction
+
+        if not (self.movable[red_dir] >> red) & 1:
+            return BLOCKED
+        if not (self.movable[direction] >> blue) & 1:
+            return BLOCKED
+        red += self.deltas[red_dir]
+        blue += self.deltas[direction]
+
+        # Wall check (phased particles pass through)
+        if (self.walls >> red) & 1 and not state & self.red_phased_bit:
+            return BLOCKED
+        if (self.walls >> blue) & 1 and not state & self.blue_phased_bit:
+            return BLOCKED
+
+        # Phase gates toggle the particle that landed on them
+        flags = state & ~self.goal_mask
+        if (self.phases >> red) & 1:
+            flags ^= self.red_phased_bit
+        if (self.phases >> blue) & 1:
+            flags ^= self.blue_phased_bit
+
+        # Swap gate under either particle swaps their positions
+        if ((self.swaps >> red) | (self.swaps >> blue)) & 1:
+            red, blue = blue, red
+
+        return flags | red | (blue << self.blue_shift)
+
+    def toggle_entangled(self, state):
+        return state ^ self.entangled_bit
+
+    def apply(self, state, action):
+        """Solver-friendly step: any action, BLOCKED if it does nothing"""
+        if action == ENTANGLE:
+            return state ^ self.entangled_bit
+        return self.move(state, action)
+
+    def is_goal(self, state):
+        return state & self.goal_mask == self.goal
+
+
+def load_board(level_num):
+    """Compile level_num and return (board, start_state)"""
+    return compile_level(LEVELS[level_num])
+
+
+def compile_level(data):
+    """Compile a level dict, built-in or from a level pack, to (board, start_state)"""
+    board = Board(data["grid"], data["red_goal"], data["blue_goal"])
+    return board, board.pack(data["red_start"], data["blue_start"])
@@ -0,0 +1,127 @@
+"""Breadth-first solver and par computation for Neon Grid levels.
+
+Searches the packed state space of quantum_core.Board with the game's exact
+rules. Arrow moves cost one move; the E toggle is free (the game doesn't
+count it either) but is part of the returned sequence. The visited set is a
+bytearray indexed by packed state and the parent links a flat int32 array,
+so the 8x8 board needs 32 KB plus 128 KB.
+
+Run directly to certify every built-in level, or every level in a pack:
+
+    python quantum_solver.py [levels.pack]
+"""
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import LevelPack
+
+from quantum_core import (
+    ACTIONS, ENTANGLE, LEFT, RIGHT, UP, DOWN, LEVELS, compile_level, load_board,
+)
+
+ACTION_NAMES = {LEFT: "LEFT", RIGHT: "RIGHT", UP: "UP", DOWN: "DOWN", ENTANGLE: "E"}
+
+# Largest state space the dense tables will allocate (bytes per table)
+MAX_STATE_BITS = 26
+
+NO_PARENT = -1
+
+
+def solve(board, start, entangle=True):
+    """Shortest action list from start to the goal, or None if unsolvable
+
+    entangle=False never presses E, for asking whether a level needs it.
+    """
+    if board.state_bits > MAX_STATE_BITS:
+        raise ValueError(f"board too large for dense search ({board.state_bits} state bits)")
+
+    goal = board.goal
+    goal_mask = board.goal_mask
+    if start & goal_mask == goal:
+        return []
+
+    size = 1 << board.state_bits
+    seen = bytearray(size)
+    parent = array("i", [NO_PARENT]) * size
+    via = bytearray(size)
+    move = board.move
+    ent = board.entangled_bit
+    directions = ACTIONS[:4]
+
+    # E is free, so a state and its toggled twin always share a layer
+    seen[start] = 1
+    frontier = [start]
+    if entangle:
+        seen[start ^ ent] = 1
+        parent[start ^ ent] = start
+        via[start ^ ent] = ENTANGLE
+        frontier.append(start ^ ent)
+
+    while frontier:
+        next_frontier = []
+        for state in frontier:
+            for direction in directions:
+                new_state = move(state, direction)
+                if new_state < 0 or seen[new_state]:
+                    continue
+                seen[new_state] = 1
+                parent[new_state] = state
+                via[new_state] = direction
+                if new_state & goal_mask == goal:
+                    return _path(parent, via, new_state)
+                twin = new_state ^ ent
+                next_frontier.append(new_state)
+                if entangle and not seen[twin]:
+                    seen[twin] = 1
+                    parent[twin] = new_state
+                    via[twin] = ENTANGLE
+                    next_frontier.append(twin)
+        frontier = next_frontier
+    return None
+
+
+def _path(parent, via, state):
+    actions = []
+    while parent[state] != NO_PARENT:
+        actions.append(via[state])
+        state = parent[state]
+    actions.reverse()
+    return actions
+
+
+def move_count(actions):
+    """Moves the game would count for an action list (E is free)"""
+    return sum(1 for action in actions if action != ENTANGLE)
+
+
+def compute_par(level_num):
+    """Optimal move count for a built-in level, or None if unsolvable"""
+    board, start = load_board(level_num)
+    actions = solve(board, start)
+    return None if actions is None else move_count(actions)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    levels = LevelPack(argv[0]) if argv else LEVELS
+    unsolvable = 0
+    for level_num, data in enumerate(levels):
+        board, start = compile_level(data)
+        started = time.perf_counter()
+        actions = solve(board, start)
+        elapsed = (time.perf_counter() - started) * 1000
+        if actions is None:
+            unsolvable += 1
+            print(f"{level_num}: {data['name']}: UNSOLVABLE ({elapsed:.1f} ms)")
+        else:
+            path = " ".join(ACTION_NAMES[action] for action in actions)
+            print(f"{level_num}: {data['name']}: par {move_count(actions)} ({elapsed:.1f} ms)")
+            print(f"   {path}")
+    return 1 if unsolvable else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Headless replay checker for Neon Grid.
+
+Fast-forwards recorded runs (see common/replay.py) through the bitboard
+rules with no window, and reports how each one ended. A run is valid when
+every byte is a real action, there are no ticks (Neon Grid has no game
+time), nothing follows the goal, and the goal is reached. Boards are
+compiled once per level and shared by every replay of it.
+
+    python verify_replays.py replays/          # a folder, or replay files
+    python verify_replays.py --workers 8 submitted/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.levelpack import load_levels
+from common.replay import decode, verify_main
+
+from quantum_core import ACTIONS, BLOCKED, ENTANGLE, LEVELS, compile_level
+
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.pack")
+
+# Verdicts
+COMPLETE, UNFINISHED, INVALID = range(3)
+VERDICT_NAMES = ("complete", "unfinished", "invalid")
+
+_levels = None
+_boards = {}
+
+
+def levels():
+    """The game's level source, opened once per process"""
+    global _levels
+    if _levels is None:
+        _levels = load_levels(PACK_PATH, LEVELS)
+    return _levels
+
+
+def compiled(level_num, level_source):
+    key = (id(level_source), level_num)
+    if key not in _boards:
+        _boards[key] = compile_level(level_source[level_num])
+    return _boards[key]
+
+
+def replay(data, level_source=None):
+    """Rebuild the run in data: (verdict, moves)"""
+    level_source = levels() if level_source is None else level_source
+    try:
+        level_num, _seed, body = decode(data)
+    except ValueError:
+        return INVALID, None
+    if level_num >= len(level_source):
+        return INVALID, None
+
+    board, state = compiled(level_num, level_source)
+    move = board.move
+    goal, goal_mask = board.goal, board.goal_mask
+    moves = 0
+    done = False
+    for op in body:
+        if done or op not in ACTIONS:
+            return INVALID, moves
+        if op == ENTANGLE:
+            state = board.toggle_entangled(state)
+            continue
+        new_state = move(state, op)
+        if new_state != BLOCKED:
+            state = new_state
+            moves += 1
+            done = state & goal_mask == goal
+    return (COMPLETE if done else UNFINISHED), moves
+
+
+def check_file(path):
+    """(path, verdict, moves) for one replay file"""
+    with open(path, "rb") as f:
+        return (path,) + replay(f.read())
+
+
+def main(argv=None):
+    return verify_main(__doc__.splitlines()[0], check_file, VERDICT_NAMES, INVALID,
+                       "({} moves)", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())